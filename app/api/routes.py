@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Request, Query
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response, PlainTextResponse
+from pydantic import BaseModel
 from typing import Optional, List
-from app.services.image_gen import generate_filtered_image
-from app.services.seasons import generate_config_seasons
+from app.services.image_gen import image_cache_key, select_matches, drawn_addresses
+from app.services.match_store import match_store
+from app.services.render_backend import render_image
+from app.services.encoding import encoding_options, negotiate, media_type
+from app.services.batch import ImageJob, prepare_batch, render_batch
+from app.services.seasons import arefresh_config_seasons
+from app.services.metrics import metrics, trace
+from app.services.profiling import PROFILERS
 # from app.core.constants import CATEGORIES
-import io
+import hmac
 import pathlib
+import time
 from app.core.templates import templates
 from app.core.config import settings
 
@@ -36,31 +44,123 @@ def categories(saison: str = Query(..., description="Saison au format YYYY-YYYY
         )
     return cats
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
 @router.get("/image")
 def image(
+    request: Request,
     saison: Optional[str] = "2025/2026",
     mode: Optional[str] = "planning",
     title: Optional[str] = "Matchs",
     format: Optional[str] = "pub",
     categories: Optional[List[str]] = Query(None),
     date_start: Optional[str] = None,
-    date_end: Optional[str] = None
+    date_end: Optional[str] = None,
+    output: Optional[str] = Query(None, description="png, png8, webp, webp-lossless, jpeg (sinon en-tête Accept)"),
+    quality: Optional[int] = Query(None, ge=1, le=100),
+    level: Optional[int] = Query(None, ge=0, le=9, description="compression PNG / effort WebP"),
+    preview: bool = Query(False, description="aperçu basse résolution (interface)"),
+    profile: Optional[str] = Query(None, description="Admin : collapsed (échantillonnage) ou cprofile")
 ):
     print(f"{mode}")
     print(f"{saison}")
     print(f"{categories}")
-    img = generate_filtered_image(categories, date_start, date_end, title, format, mode, saison)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    return StreamingResponse(buf, media_type="image/png")
+    try:
+        encoding = encoding_options(output or negotiate(request.headers.get("accept")), quality, level)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    if profile:
+        return _profile_image(request, profile, categories, date_start, date_end, title, format, mode, saison, encoding, preview)
+
+    with trace() as current:
+        # un seul instantané pour la clé et le rendu : un rafraîchissement en
+        # arrière-plan entre les deux ne peut pas associer l'ETag à d'autres données
+        snapshot = match_store.for_query(saison, date_start, date_end, categories)
+        # adresses résolues avant la clé : l'ETag décrit ce qui est dessiné, et
+        # une fiche en échec est retentée à chaque requête, 304 compris
+        addresses = drawn_addresses(select_matches(snapshot, categories, date_start, date_end), preview) \
+            if mode == "planning" else None
+        key = image_cache_key(categories, date_start, date_end, title, format, mode, saison,
+                              snapshot=snapshot, encoding=encoding, preview=preview, addresses=addresses)
+        etag = f'"{key}"'
+        # no-cache : le client revalide à chaque fois via If-None-Match
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            status, data = 304, None
+        else:
+            status, data = 200, render_image(key, categories, date_start, date_end, title, format, mode, saison,
+                                             snapshot=snapshot, addresses=addresses, encoding=encoding, preview=preview)
+
+    headers["Server-Timing"] = current.server_timing()
+    metrics.observe("ffvb_request_seconds", time.perf_counter() - current.started, route="/image", status=status)
+    if data is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type=media_type(encoding), headers=headers)
+
+def _is_admin(request: Request) -> bool:
+    token = settings.admin_token
+    return bool(token) and hmac.compare_digest(request.headers.get("x-admin-token", ""), token)
+
+def _profile_image(request, profile, categories, date_start, date_end, title, format, mode, saison, encoding, preview=False):
+    """
+    Rend l'image sous profileur et renvoie le profil au lieu du PNG.
+    Cache de rendus ignoré et rendu dans ce thread, pour que la récupération
+    des données, la mise en page et la composition apparaissent.
+    """
+    if not _is_admin(request):
+        return JSONResponse(status_code=403, content={"error": "Profilage réservé aux administrateurs"})
+    if profile not in PROFILERS:
+        return JSONResponse(status_code=400, content={"error": f"Profileur inconnu : {profile} ({', '.join(PROFILERS)})"})
+
+    def run():
+        render_image(None, categories, date_start, date_end, title, format, mode, saison,
+                     use_cache=False, backend="thread", encoding=encoding, preview=preview)
+
+    with trace() as current:
+        if profile == "collapsed":
+            body = PROFILERS[profile](run, settings.profile_interval)
+        else:
+            body = PROFILERS[profile](run)
+    return PlainTextResponse(body, headers={"Server-Timing": current.server_timing(), "Cache-Control": "no-store"})
+
+@router.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+class ImageBatch(BaseModel):
+    jobs: List[ImageJob]
+
+@router.post("/images")
+def images(batch: ImageBatch):
+    """Rend plusieurs images en une passe et les renvoie dans un ZIP, au fil de l'eau."""
+    # Erreurs possibles avant le 200 : une fois le ZIP commencé, seules
+    # les erreurs de rendu par image restent (fichiers .error.txt)
+    try:
+        prepared = prepare_batch(batch.jobs)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        print(f"Erreur préparation du lot: {e}")
+        return JSONResponse(status_code=502, content={"error": f"Données FFVB indisponibles : {e}"})
+    return StreamingResponse(
+        render_batch(batch.jobs, prepared),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="images.zip"'},
+    )
 
 @router.post("/update-config")
-def update_config():
+async def update_config():
     club_id = settings.config["club"]["id"]
     club_saisons = settings.config["club"]["saisons"]
     try:
-        generate_config_seasons(club_id, club_saisons, "saisons.yaml")
+        await arefresh_config_seasons(club_id, club_saisons, str(settings.saisons_path))
+        # rechargement immédiat pour ce worker ; les autres suivent via le mtime
+        settings.reload_saisons()
         return {"message": "Configuration mise à jour avec succès."}
     except Exception as e:
         return {"message": f"Erreur : {e}"}
\ No newline at end of file
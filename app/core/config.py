@@ -1,6 +1,10 @@
+import hashlib
+import os
+import threading
+import time
 import yaml
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, NamedTuple
 
 def _safe_load_yaml(path: Path) -> Dict[str, Any]:
     if not path.exists():
@@ -9,6 +13,65 @@ def _safe_load_yaml(path: Path) -> Dict[str, Any]:
         data = yaml.safe_load(f)
     return data or {}
 
+def _saisons_mapping(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Compat: accepte soit un fichier saisons.yaml avec racine 'saisons',
+    # soit directement le mapping des saisons à la racine.
+    if "saisons" in doc and isinstance(doc["saisons"], dict):
+        return doc["saisons"]
+    return doc
+
+class SeasonsSnapshot(NamedTuple):
+    version: str      # empreinte du contenu : identique pour tous les workers
+    stamp: tuple      # (mtime_ns, taille) du fichier lu
+    saisons: Dict[str, Any]
+
+class SeasonConfigStore:
+    """
+    saisons.yaml versionné, rechargé quand le fichier change.
+    Le fichier est vérifié (stat) au plus toutes les `check_interval`
+    secondes ; un nouveau contenu est parsé puis publié en remplaçant
+    l'instantané d'un coup. Chaque worker uvicorn suit le même fichier et
+    converge donc vers la même version.
+    """
+    def __init__(self, path: Path, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._snapshot = SeasonsSnapshot("", (0, 0), {})
+        self.reload(force=True)
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return (0, 0)
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self, force: bool = False) -> SeasonsSnapshot:
+        with self._lock:
+            stamp = self._stamp()
+            self._checked_at = time.monotonic()
+            if not force and stamp == self._snapshot.stamp:
+                return self._snapshot
+            raw = self.path.read_bytes() if stamp != (0, 0) else b""
+            version = hashlib.sha1(raw).hexdigest()[:12]
+            if version != self._snapshot.version:
+                saisons = _saisons_mapping(yaml.safe_load(raw) or {}) if raw else {}
+                self._snapshot = SeasonsSnapshot(version, stamp, saisons)
+            else:
+                self._snapshot = self._snapshot._replace(stamp=stamp)
+            return self._snapshot
+
+    def current(self) -> SeasonsSnapshot:
+        if time.monotonic() - self._checked_at > self.check_interval:
+            try:
+                return self.reload()
+            except Exception as e:
+                # fichier en cours d'écriture ou invalide : on garde la version connue
+                print(f"Rechargement de {self.path.name} impossible: {e}")
+        return self._snapshot
+
 class Settings:
     """
     - config.yaml  : configuration générale (ffvb, club, championnat, etc.)
@@ -28,15 +91,8 @@ class Settings:
 
         # Chargements séparés
         self.config: Dict[str, Any] = _safe_load_yaml(self.config_path)
-        self._saisons_doc: Dict[str, Any] = _safe_load_yaml(self.saisons_path)
-
-        # Compat: accepte soit un fichier saisons.yaml avec racine 'saisons',
-        # soit directement le mapping des saisons à la racine.
-        if "saisons" in self._saisons_doc and isinstance(self._saisons_doc["saisons"], dict):
-            self.saisons: Dict[str, Any] = self._saisons_doc["saisons"]
-        else:
-            # tolère un fichier où les saisons sont à la racine
-            self.saisons = self._saisons_doc
+        # saisons.yaml est réécrit à chaud (/update-config) : rechargé à la volée
+        self.saisons_store = SeasonConfigStore(self.saisons_path)
 
     # ---- Accès config générale (config.yaml) ----
     @property
@@ -47,6 +103,129 @@ class Settings:
     def ffvb_address_url(self):
         return self.config.get("ffvb", {}).get("address_pdf_url")
 
+    @property
+    def ffvb_planning_url(self):
+        return self.config.get("ffvb", {}).get("planning_url", "https://www.ffvbbeach.org/ffvbapp/resu/planning_club_class.php")
+
+    @property
+    def http_cache_backend(self):
+        return self.config.get("http", {}).get("cache_backend", "sqlite")
+
+    @property
+    def http_cache_path(self):
+        return self.config.get("http", {}).get("cache_path", "/tmp/ffvb_cache/http_cache.sqlite")
+
+    @property
+    def http_cache_ttl(self):
+        return self.config.get("http", {}).get("cache_ttl", 600)
+
+    @property
+    def http_max_connections(self):
+        return self.config.get("http", {}).get("max_connections", 20)
+
+    def http_endpoint(self, name: str) -> dict:
+        return self.config.get("http", {}).get("endpoints", {}).get(name, {}) or {}
+
+    @property
+    def ffvb_address_concurrency(self):
+        return self.config.get("ffvb", {}).get("address_concurrency", 8)
+
+    @property
+    def ffvb_address_timeout(self):
+        return self.config.get("ffvb", {}).get("address_timeout", 10)
+
+    @property
+    def matches_ttl(self):
+        return self.config.get("matches", {}).get("ttl", 600)
+
+    @property
+    def venues_path(self):
+        return self.config.get("venues", {}).get("path", "/tmp/ffvb_cache/venues.sqlite")
+
+    @property
+    def venues_ttl(self):
+        return self.config.get("venues", {}).get("ttl", 7*24*3600)
+
+    @property
+    def venues_negative_ttl(self):
+        return self.config.get("venues", {}).get("negative_ttl", 3600)
+
+    @property
+    def render_cache_max_bytes(self):
+        return self.config.get("render_cache", {}).get("max_mb", 256) * 1024 * 1024
+
+    @property
+    def render_cache_max_age(self):
+        return self.config.get("render_cache", {}).get("max_age", 24*3600)
+
+    @property
+    def header_cache_max_bytes(self):
+        return self.config.get("render", {}).get("header_cache_mb", 128) * 1024 * 1024
+
+    @property
+    def tile_cache_max_bytes(self):
+        return self.config.get("render", {}).get("tile_cache_mb", 256) * 1024 * 1024
+
+    @property
+    def render_backend(self):
+        return self.config.get("render", {}).get("backend", "thread")
+
+    @property
+    def render_workers(self):
+        return self.config.get("render", {}).get("workers", 2)
+
+    @property
+    def batch_workers(self):
+        return self.config.get("batch", {}).get("workers", 4)
+
+    @property
+    def output_default(self):
+        return self.config.get("output", {}).get("default", "png")
+
+    def output_options(self, output: str) -> dict:
+        return self.config.get("output", {}).get(output, {}) or {}
+
+    @property
+    def preview_multiplier(self):
+        return int(self.config.get("preview", {}).get("multiplier", 1))
+
+    @property
+    def admin_token(self):
+        return os.environ.get("FFVB_ADMIN_TOKEN") or self.config.get("admin", {}).get("token") or ""
+
+    @property
+    def profile_interval(self):
+        return self.config.get("admin", {}).get("profile_interval", 0.005)
+
+    @property
+    def snapshot_enabled(self):
+        return bool(self.config.get("snapshot", {}).get("enabled", False))
+
+    @property
+    def snapshot_dir(self):
+        # relatif à la racine du dépôt
+        return self.base_dir / self.config.get("snapshot", {}).get("dir", "snapshots")
+
+    @property
+    def snapshot_version(self):
+        return str(self.config.get("snapshot", {}).get("version", "latest"))
+
+    @property
+    def scheduler_enabled(self):
+        return self.config.get("scheduler", {}).get("enabled", False)
+
+    @property
+    def scheduler_jitter(self):
+        return self.config.get("scheduler", {}).get("jitter", 60)
+
+    @property
+    def scheduler_lock_path(self):
+        return self.config.get("scheduler", {}).get("lock_path", "/tmp/ffvb_cache/scheduler.lock")
+
+    @property
+    def scheduler_jobs(self):
+        return self.config.get("scheduler", {}).get("jobs", []) or []
+
     @property
     def club(self):
         return self.config.get("club", {}).get("name")
@@ -63,7 +242,26 @@ class Settings:
     def club_saisons(self):
         return self.config.get("club", {}).get("saisons", [])
 
+    @property
+    def assets_preload_formats(self):
+        return self.config.get("assets", {}).get("preload_formats", ["pub"])
+
+    @property
+    def assets_preload_multipliers(self):
+        return self.config.get("assets", {}).get("preload_multipliers", [2])
+
     # ---- Accès saisons (saisons.yaml) ----
+    @property
+    def saisons(self) -> Dict[str, Any]:
+        return self.saisons_store.current().saisons
+
+    @property
+    def saisons_version(self) -> str:
+        return self.saisons_store.current().version
+
+    def reload_saisons(self):
+        return self.saisons_store.reload()
+
     def get_season_config(self, saison: str, code: str) -> dict:
         """
         Récupère la configuration d'une catégorie pour une saison donnée
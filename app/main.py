@@ -4,7 +4,11 @@ import pathlib
 import asyncio
 
 from app.api.routes import router
-from app.services.seasons import generate_config_seasons
+from app.services.seasons import arefresh_config_seasons
+from app.services.assets import warm_assets
+from app.services.render_backend import shutdown_pool
+from app.services.ffvb_client import ffvb_client
+from app.services.scheduler import scheduler
 from app.core.config import settings
 
 BASE_DIR = pathlib.Path(__file__).resolve().parent.parent
@@ -18,4 +22,21 @@ async def on_startup():
     club_id = settings.config["club"]["id"]
     club_saisons = settings.config["club"]["saisons"]
     # hors thread pour éviter de bloquer la boucle
-    await asyncio.to_thread(generate_config_seasons, club_id, club_saisons, "saisons.yaml")
\ No newline at end of file
+    await asyncio.to_thread(warm_assets, settings.assets_preload_formats, settings.assets_preload_multipliers)
+    # On sert tout de suite avec le saisons.yaml existant ; rafraîchissement en arrière-plan
+    app.state.seasons_refresh = asyncio.create_task(_refresh_seasons(club_id, club_saisons))
+    scheduler.start()
+
+async def _refresh_seasons(club_id, club_saisons):
+    try:
+        changed = await arefresh_config_seasons(club_id, club_saisons, str(settings.saisons_path))
+        settings.reload_saisons()
+        print(f"[STARTUP] saisons mises à jour: {changed or 'aucune'}")
+    except Exception as e:
+        print(f"[STARTUP] rafraîchissement des saisons en erreur: {e}")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await scheduler.stop()
+    shutdown_pool()
+    await ffvb_client.aclose()
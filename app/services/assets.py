@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from PIL import Image, ImageFont
+from app.services.image_utils import fit_image_to_box
+from app.services.metrics import metrics
+import hashlib
+import os
+import threading
+import time
+
+BASE_PATH = Path(__file__).resolve().parent.parent  # == app/
+ASSETS_DIR = BASE_PATH / "assets"
+FONTS_DIR = ASSETS_DIR / "fonts"
+CLUBS_DIR = ASSETS_DIR / "clubs"
+ICONS_DIR = ASSETS_DIR / "icons"
+BACKGROUNDS_DIR = ASSETS_DIR / "backgrounds"
+BANNERS_DIR = ASSETS_DIR / "banners"
+
+# Nom logique -> (fichier TTF, taille de base avant multiplicateur)
+FONT_SPECS = {
+    "main": ("DejaVuSans.ttf", 50),
+    "bold_10": ("OpenSans-ExtraBold.ttf", 10),
+    "bold_12": ("OpenSans-ExtraBold.ttf", 12),
+    "bold_13": ("OpenSans-ExtraBold.ttf", 13),
+    "bold_14": ("OpenSans-ExtraBold.ttf", 14),
+    "bold_15": ("OpenSans-ExtraBold.ttf", 15),
+    "bold_25": ("OpenSans-ExtraBold.ttf", 25),
+    "title": ("Gagalin-Regular.ttf", 35),
+    "sets": ("Coiny-Regular.ttf", 30),
+    "victory": ("Coiny-Regular.ttf", 25),
+    "date_title": ("Coiny-Regular.ttf", 20),
+}
+
+# Les objets retournés ci-dessous sont partagés par tout le processus :
+# ils ne doivent jamais être modifiés en place (utiliser .copy() si besoin).
+
+@lru_cache(maxsize=None)
+def get_font(filename: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(FONTS_DIR / filename, size=size)
+
+@lru_cache(maxsize=None)
+def get_fonts(multiplier: int = 2) -> dict:
+    m = multiplier
+    return {name: get_font(filename, size*m) for name, (filename, size) in FONT_SPECS.items()}
+
+# Fonds et bandeaux sont dessinés pour ce multiplicateur ; les autres
+# échelles (aperçu) en sont des copies redimensionnées une fois pour toutes.
+NATIVE_MULTIPLIER = 2
+
+def _scaled(img: Image.Image, multiplier: int) -> Image.Image:
+    if multiplier == NATIVE_MULTIPLIER:
+        return img
+    size = (round(img.width * multiplier / NATIVE_MULTIPLIER), round(img.height * multiplier / NATIVE_MULTIPLIER))
+    return img.resize(size, Image.LANCZOS)
+
+@lru_cache(maxsize=None)
+def get_background(format: str = "pub", multiplier: int = NATIVE_MULTIPLIER) -> Image.Image:
+    if multiplier != NATIVE_MULTIPLIER:
+        return _scaled(get_background(format), multiplier)
+    return Image.open(BACKGROUNDS_DIR / f"{format}.png").convert("RGBA")
+
+def new_canvas(format: str = "pub", multiplier: int = NATIVE_MULTIPLIER) -> Image.Image:
+    """Copie modifiable du fond pour un rendu (le décodage PNG n'est fait qu'une fois)."""
+    return get_background(format, multiplier).copy()
+
+@lru_cache(maxsize=None)
+def get_banner(name: str, multiplier: int = NATIVE_MULTIPLIER) -> Image.Image:
+    if multiplier != NATIVE_MULTIPLIER:
+        return _scaled(get_banner(name), multiplier)
+    return Image.open(BANNERS_DIR / f"{name}.png").convert("RGBA")
+
+@lru_cache(maxsize=None)
+def get_icon(name: str, size: int) -> Image.Image:
+    return Image.open(ICONS_DIR / f"{name}.png").convert("RGBA").resize((size, size))
+
+# ---- Logos des clubs (pré-redimensionnés) ----
+
+NO_LOGO = "no_logo"
+LOGO_CACHE_SIZE = 256
+LOGO_MANIFEST_TTL = 30  # secondes entre deux relectures du dossier clubs/
+
+_logo_lock = threading.Lock()
+_logo_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_logo_manifest: dict = {}
+_logo_manifest_at = 0.0
+logo_stats = {"hits": 0, "misses": 0}
+metrics.register_cache("logos", lambda: (logo_stats["hits"], logo_stats["misses"]))
+
+def _scan_logos() -> dict:
+    manifest = {}
+    with os.scandir(CLUBS_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".png"):
+                manifest[entry.name[:-4]] = entry.stat().st_mtime_ns
+    return manifest
+
+def logo_manifest() -> dict:
+    """
+    Codes club disponibles sur disque -> mtime du fichier.
+    Relu au plus toutes les LOGO_MANIFEST_TTL secondes : un logo ajouté ou
+    modifié est pris en compte sans jamais tester un chemin connu absent.
+    """
+    global _logo_manifest, _logo_manifest_at
+    now = time.monotonic()
+    if now - _logo_manifest_at > LOGO_MANIFEST_TTL:
+        _logo_manifest = _scan_logos()
+        _logo_manifest_at = now
+    return _logo_manifest
+
+def get_club_logo(code: str, box_width: int, box_height: int) -> Image.Image:
+    """Logo du club déjà ajusté à la boîte (fallback no_logo si absent)."""
+    manifest = logo_manifest()
+    if code not in manifest:
+        code = NO_LOGO
+    mtime = manifest.get(code)
+    key = (code, box_width, box_height)
+
+    with _logo_lock:
+        entry = _logo_cache.get(key)
+        if entry and entry[0] == mtime:
+            _logo_cache.move_to_end(key)
+            logo_stats["hits"] += 1
+            return entry[1]
+
+    logo = fit_image_to_box(Image.open(CLUBS_DIR / f"{code}.png").convert("RGBA"), box_width, box_height)
+
+    with _logo_lock:
+        logo_stats["misses"] += 1
+        _logo_cache[key] = (mtime, logo)
+        _logo_cache.move_to_end(key)
+        while len(_logo_cache) > LOGO_CACHE_SIZE:
+            _logo_cache.popitem(last=False)
+    return logo
+
+# ---- Version des assets (invalidation des caches dérivés) ----
+
+ASSETS_VERSION_TTL = 30  # secondes entre deux relectures des mtimes
+
+_assets_version = None
+_assets_version_at = 0.0
+
+def _scan_assets_version() -> str:
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(ASSETS_DIR):
+        dirs.sort()
+        for name in sorted(files):
+            st = os.stat(os.path.join(root, name))
+            digest.update(f"{root}/{name}:{st.st_mtime_ns}:{st.st_size}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def assets_version(expected: str = None) -> str:
+    """
+    Empreinte des fichiers d'assets (chemins + mtimes), relue au plus toutes
+    les ASSETS_VERSION_TTL secondes. Un changement vide le registre pour que
+    les rendus suivants utilisent les nouveaux fichiers.
+    `expected` : version vue par le processus parent (pool de rendu) ; si
+    elle diffère de la version connue, relecture immédiate.
+    """
+    global _assets_version, _assets_version_at, _logo_manifest_at
+    now = time.monotonic()
+    if now - _assets_version_at > ASSETS_VERSION_TTL or (expected and expected != _assets_version):
+        version = _scan_assets_version()
+        if _assets_version is not None and version != _assets_version:
+            for cached in (get_font, get_fonts, get_background, get_banner, get_icon):
+                cached.cache_clear()
+            _logo_manifest_at = -LOGO_MANIFEST_TTL   # logos : relecture du dossier au prochain accès
+        _assets_version = version
+        _assets_version_at = now
+    return _assets_version
+
+def warm_assets(formats=("pub",), multipliers=(2,)):
+    """Précharge polices, fonds, bandeaux, icônes et logos (appelé au démarrage)."""
+    for m in multipliers:
+        get_fonts(m)
+        for name in ("int", "ext"):
+            get_icon(name, 40*m)
+        for code in logo_manifest():
+            get_club_logo(code, 65*m, 65*m)
+        for format in formats:
+            get_background(format, m)
+        for name in ("planning", "result_green", "result_red", "result_yellow"):
+            get_banner(name, m)
+    # police de la grille des scores (score_utils)
+    get_font("OpenSans-ExtraBold.ttf", 40)
@@ -0,0 +1,107 @@
+import io
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, NamedTuple, Optional
+from pydantic import BaseModel
+from app.core.config import settings
+from app.services.data_provider import get_gymnase_addresses
+from app.services.image_gen import image_cache_key, select_matches, _parse_date
+from app.services.match_store import match_store
+from app.services.render_backend import render_image
+from app.services.encoding import encoding_options, extension
+
+class ImageJob(BaseModel):
+    saison: str = "2025/2026"
+    mode: str = "planning"
+    title: str = "Matchs"
+    format: str = "pub"
+    categories: Optional[List[str]] = None
+    date_start: Optional[str] = None
+    date_end: Optional[str] = None
+    name: Optional[str] = None  # nom du fichier dans le ZIP
+    output: Optional[str] = None  # png, png8, webp, webp-lossless, jpeg (défaut : config)
+
+class _ZipStream(io.RawIOBase):
+    """Flux non positionnable : zipfile y écrit, on vide au fil de l'eau."""
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _job_filename(i, job):
+    name = job.name or f"{i+1:02d}_{job.mode}_{job.format}"
+    name = re.sub(r"[^\w.-]+", "_", name).strip("_") or f"image_{i+1:02d}"
+    ext = "." + extension(encoding_options(job.output))
+    return name if name.endswith(ext) else f"{name}{ext}"
+
+class PreparedBatch(NamedTuple):
+    snapshots: list   # SeasonMatches de chaque job
+    addresses: dict   # (codmatch, codent) -> adresse
+
+def prepare_batch(jobs: List[ImageJob]) -> PreparedBatch:
+    """
+    Tout ce qui peut échouer avant le premier octet du ZIP : validation
+    (ValueError : sortie inconnue, date invalide), instantané de chaque job
+    et une seule résolution d'adresses pour tous les jobs.
+    """
+    for i, job in enumerate(jobs):
+        try:
+            encoding_options(job.output)
+            _parse_date(job.date_start)
+            _parse_date(job.date_end)
+        except ValueError as e:
+            raise ValueError(f"Job {i+1} : {e}") from e
+
+    snapshots = [match_store.for_query(job.saison, job.date_start, job.date_end, job.categories) for job in jobs]
+
+    pairs = []
+    for job, snapshot in zip(jobs, snapshots):
+        if job.mode == "planning":
+            pairs += [(mt.codmatch, mt.entity) for mt in select_matches(snapshot, job.categories, job.date_start, job.date_end)]
+    addresses = get_gymnase_addresses(
+        pairs,
+        max_workers=settings.ffvb_address_concurrency,
+        timeout=settings.ffvb_address_timeout,
+    ) if pairs else {}
+    return PreparedBatch(snapshots, addresses)
+
+def render_batch(jobs: List[ImageJob], prepared: Optional[PreparedBatch] = None, max_workers=None):
+    """
+    Générateur d'octets ZIP : rendus répartis sur un pool, chaque image
+    ajoutée à l'archive dès qu'elle est prête. `prepared` (prepare_batch)
+    doit être obtenu avant de commencer à répondre.
+    """
+    max_workers = max_workers or settings.batch_workers
+    snapshots, addresses = prepared or prepare_batch(jobs)
+
+    def run(job, snapshot):
+        params = (job.categories, job.date_start, job.date_end, job.title, job.format, job.mode, job.saison)
+        encoding = encoding_options(job.output)
+        key = image_cache_key(*params, snapshot=snapshot, encoding=encoding, addresses=addresses)
+        return render_image(key, *params, snapshot=snapshot, addresses=addresses, encoding=encoding)
+
+    stream = _ZipStream()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(run, job, snapshot): i for i, (job, snapshot) in enumerate(zip(jobs, snapshots))}
+        with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for future in as_completed(futures):
+                i = futures[future]
+                filename = _job_filename(i, jobs[i])
+                try:
+                    archive.writestr(filename, future.result())
+                except Exception as e:
+                    print(f"Erreur rendu {filename}: {e}")
+                    archive.writestr(f"{filename.rsplit('.', 1)[0]}.error.txt", str(e))
+                yield stream.drain()
+    yield stream.drain()
@@ -1,31 +1,40 @@
-import requests
-import requests_cache
+import contextvars
 import csv
 import io
 import pdfplumber
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from app.core.config import settings
-from pathlib import Path
-
-CACHE_DIR = Path("/tmp/ffvb_cache")
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-
-requests_cache.install_cache(str(CACHE_DIR / "http_cache"),expire_after=600)
-
-def get_gymnase_address(codmatch, codent):
-    url = settings.ffvb_address_url
-    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-    data = {'codmatch': codmatch, 'codent': codent}
-    response = requests.post(url, headers=headers, data=data)
-    
-    if getattr(response, "from_cache", False):
+from app.services.ffvb_client import ffvb_client
+from app.services.metrics import span
+from app.services.single_flight import SingleFlight
+from app.services.snapshot import snapshots
+from app.services.venue_store import venue_store
+
+# Téléchargements identiques simultanés (lien partagé ouvert par plusieurs
+# personnes, préchargement de l'aperçu) : un seul appel FFVB
+_address_flight = SingleFlight("match_sheet")
+
+def get_gymnase_address(codmatch, codent, timeout=None):
+    if settings.snapshot_enabled:
+        return snapshots.address(codmatch, codent)
+    return _address_flight.do((codmatch, codent), _fetch_gymnase_address, codmatch, codent, timeout)
+
+def _fetch_gymnase_address(codmatch, codent, timeout):
+    response = ffvb_client.request("match_sheet", {'codmatch': codmatch, 'codent': codent}, timeout=timeout)
+    return parse_gymnase_pdf(response, codmatch, codent)
+
+def parse_gymnase_pdf(response, codmatch, codent):
+    if response.from_cache:
         print(f"[CACHE] Gymnase PDF {codmatch}/{codent}")
 
-    if response.status_code != 200 or response.headers.get('Content-Type') != 'application/pdf':
-        print("Erreur lors du téléchargement du PDF.")
-        return None
+    # Réponse en erreur (5xx, page HTML) : échec, pas une absence d'adresse.
+    # Seul un PDF lu sans salle donne None (entrée négative dans l'index).
+    if response.status_code != 200 or response.content_type.split(';')[0].strip() != 'application/pdf':
+        raise RuntimeError(f"Fiche match {codmatch}/{codent} indisponible : HTTP {response.status_code} {response.content_type}")
 
-    with pdfplumber.open(io.BytesIO(response.content)) as pdf:
+    with span("pdf_parse"), pdfplumber.open(io.BytesIO(response.content)) as pdf:
         text = ''
         for page in pdf.pages:
             t = page.extract_text()
@@ -52,29 +61,155 @@ def get_gymnase_address(codmatch, codent):
                     return {'nom': nom, 'rue': rue, 'code_postal': code_postal, 'ville': ville}
     return None
 
-def parse_csv_rows(saison):
-    url = settings.ffvb_csv_url
-    saison = saison.replace("-", "/")
-
-    payload = {
+# Distingue un échec (réseau, timeout) d'un résultat négatif (None)
+_FETCH_FAILED = object()
+
+def _safe_get_gymnase_address(codmatch, codent, timeout):
+    try:
+        return get_gymnase_address(codmatch, codent, timeout=timeout)
+    except Exception as e:
+        print(f"Erreur adresse gymnase {codmatch}/{codent}: {e}")
+        return _FETCH_FAILED
+
+@span("addresses")
+def get_gymnase_addresses(pairs, max_workers=8, timeout=10):
+    """
+    Résout les adresses de plusieurs matchs.
+    Les entrées fraîches viennent de l'index persistant (venue_store) en une
+    requête ; les autres sont téléchargées en parallèle puis enregistrées.
+    Retourne {(codmatch, codent): adresse ou None} ; une adresse en erreur ou
+    hors délai retombe sur la valeur périmée connue, sinon None, sans faire
+    échouer les autres. En mode snapshot, tout vient de l'index du bundle.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return {}
+    if settings.snapshot_enabled:
+        return snapshots.addresses(pairs)
+
+    known = venue_store.get_many(pairs)
+    results = {pair: address for pair, (address, fresh) in known.items() if fresh}
+    missing = [pair for pair in pairs if pair not in results]
+    if not missing:
+        return results
+
+    workers = max(1, min(max_workers, len(missing)))
+    # Garde-fou global : le timeout HTTP ne couvre pas le parsing du PDF
+    deadline = timeout * (len(missing) // workers + 1) if timeout else None
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    # contexte copié : les téléchargements alimentent la Trace de la requête
+    futures = {executor.submit(contextvars.copy_context().run, _safe_get_gymnase_address, codmatch, codent, timeout): (codmatch, codent)
+               for codmatch, codent in missing}
+    done, _ = wait(futures, timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    fetched = {}
+    failed = False
+    for future, pair in futures.items():
+        address = future.result() if future in done else _FETCH_FAILED
+        if address is _FETCH_FAILED:
+            failed = True
+            if future not in done:
+                print(f"Timeout adresse gymnase {pair[0]}/{pair[1]}")
+            # repli sur l'entrée périmée si elle existe
+            results[pair] = known.get(pair, (None, False))[0]
+        else:
+            fetched[pair] = address
+            results[pair] = address
+
+    venue_store.put_many(fetched)
+    if failed:
+        venue_store.record_failure()
+    return results
+
+# Aperçu : adresse affichée tant que la fiche match n'a pas été récupérée
+PENDING_ADDRESS = {'nom': '', 'rue': 'Adresse en cours de recherche', 'code_postal': '', 'ville': ''}
+
+_prefetching = set()
+_prefetch_lock = threading.Lock()
+
+def prefetch_gymnase_addresses(pairs):
+    """Résout `pairs` dans un thread d'arrière-plan (une seule fois par paire en cours)."""
+    with _prefetch_lock:
+        pairs = [pair for pair in dict.fromkeys(pairs) if pair not in _prefetching]
+        _prefetching.update(pairs)
+    if not pairs:
+        return
+
+    def run():
+        try:
+            get_gymnase_addresses(pairs, max_workers=settings.ffvb_address_concurrency,
+                                  timeout=settings.ffvb_address_timeout)
+        finally:
+            with _prefetch_lock:
+                _prefetching.difference_update(pairs)
+
+    threading.Thread(target=run, name="venue-prefetch", daemon=True).start()
+
+def cached_gymnase_addresses(pairs):
+    """
+    Adresses sans téléchargement (aperçu) : celles de l'index, même périmées ;
+    les inconnues valent PENDING_ADDRESS et sont résolues en arrière-plan,
+    comme les périmées.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if settings.snapshot_enabled:
+        return snapshots.addresses(pairs)
+    known = venue_store.get_many(pairs)
+    prefetch_gymnase_addresses([pair for pair in pairs if not known.get(pair, (None, False))[1]])
+    return {pair: known[pair][0] if pair in known else PENDING_ADDRESS for pair in pairs}
+
+def _csv_payload(saison):
+    return {
         "cnclub": settings.club_id,
-        "cal_saison": saison,
+        "cal_saison": saison.replace("-", "/"),
         "typ_edition": "E",
         "type": "RES"
     }
 
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    response = requests.post(url, data=payload, headers=headers)
-
-    if getattr(response, "from_cache", False):
-        print("[CACHE] CSV FFVB")
-
-    response.raise_for_status()
-    csv_utf8_str = response.content.decode('latin1').encode('utf-8').decode('utf-8')
-    
-    return csv.reader(io.StringIO(csv_utf8_str), delimiter=";", quotechar='"')
-
-def parse_local_csv_rows():
-    with open("export20242025_utf8.csv", newline="", encoding="utf-8") as csvfile:
-        return csv.reader(csvfile, delimiter=";", quotechar='"')
-
+class _ChunkReader(io.RawIOBase):
+    """Flux binaire au-dessus d'un itérable de morceaux (corps HTTP, mmap)."""
+    def __init__(self, chunks, digest=None):
+        self._chunks = iter(chunks)
+        self._pending = b""
+        self._digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+            if self._digest is not None:
+                self._digest.update(self._pending)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+def _stream_reader(chunks, digest=None):
+    # Décodage latin-1 incrémental, ligne à ligne : le texte complet n'est jamais construit
+    text = io.TextIOWrapper(io.BufferedReader(_ChunkReader(chunks, digest)), encoding="latin-1", newline="")
+    return csv.reader(text, delimiter=";", quotechar='"')
+
+def parse_csv_rows(saison, digest=None):
+    """
+    Lignes de l'export CSV de la saison, décodées au fil du téléchargement.
+    `digest` (hashlib) reçoit les octets bruts lus, pour versionner l'export.
+    """
+    if settings.snapshot_enabled:
+        yield from parse_local_csv_rows(saison, digest)
+        return
+    with ffvb_client.stream("csv", _csv_payload(saison)) as response:
+        if response.from_cache:
+            print("[CACHE] CSV FFVB")
+        response.raise_for_status()
+        yield from _stream_reader(response.chunks, digest)
+
+def parse_local_csv_rows(saison, digest=None):
+    """Export CSV de la saison lu dans le bundle snapshot (cf. snapshot.py)."""
+    return _stream_reader(snapshots.bundle(saison).csv_chunks(), digest)
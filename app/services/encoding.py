@@ -0,0 +1,104 @@
+import io
+from typing import NamedTuple, Optional
+from PIL import Image
+from app.core.config import settings
+
+# ---- Encodeurs ----
+# Chaque encodeur reçoit l'image RGBA du rendu et des options normalisées
+# (cf. encoding_options) : elles entrent dans la clé du cache de rendus.
+
+def _flatten(img, color=(255, 255, 255)):
+    """RGBA -> RGB sur fond uni (JPEG n'a pas de canal alpha)."""
+    if img.mode != "RGBA":
+        return img.convert("RGB")
+    flat = Image.new("RGB", img.size, color)
+    flat.paste(img, mask=img.getchannel("A"))
+    return flat
+
+def _encode_png(img, buf, opts):
+    img.save(buf, format="PNG", compress_level=opts["level"])
+
+def _encode_png8(img, buf, opts):
+    # Palette adaptative : fichiers bien plus légers pour le partage
+    quantized = img.quantize(colors=opts["colors"], method=Image.Quantize.FASTOCTREE)
+    quantized.save(buf, format="PNG", optimize=True)
+
+def _encode_webp(img, buf, opts):
+    img.save(buf, format="WEBP", quality=opts["quality"], method=opts["level"])
+
+def _encode_webp_lossless(img, buf, opts):
+    img.save(buf, format="WEBP", lossless=True, quality=opts["quality"], method=opts["level"])
+
+def _encode_jpeg(img, buf, opts):
+    _flatten(img).save(buf, format="JPEG", quality=opts["quality"])
+
+class Output(NamedTuple):
+    media_type: str
+    extension: str
+    encoder: object
+    defaults: dict
+
+OUTPUTS = {
+    "png": Output("image/png", "png", _encode_png, {"level": 6}),
+    "png8": Output("image/png", "png", _encode_png8, {"colors": 256}),
+    "webp": Output("image/webp", "webp", _encode_webp, {"quality": 85, "level": 4}),
+    "webp-lossless": Output("image/webp", "webp", _encode_webp_lossless, {"quality": 60, "level": 4}),
+    "jpeg": Output("image/jpeg", "jpg", _encode_jpeg, {"quality": 88}),
+}
+
+# Type MIME (en-tête Accept) -> sortie
+ACCEPTED = {"image/png": "png", "image/webp": "webp", "image/jpeg": "jpeg"}
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Sortie préférée d'après l'en-tête Accept (ordre des q décroissants),
+    None si le client accepte tout (*/*, image/*) ou rien de connu.
+    """
+    if not accept:
+        return None
+    ranges = []
+    for i, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, i, media.lower()))
+    for _, _, media in sorted(ranges):
+        if media in ACCEPTED:
+            return ACCEPTED[media]
+        if media in ("*/*", "image/*"):
+            return None
+    return None
+
+def encoding_options(output: Optional[str] = None, quality: Optional[int] = None, level: Optional[int] = None) -> dict:
+    """
+    Options complètes d'encodage : valeurs par défaut de la sortie,
+    surchargées par config.yaml (section output) puis par la requête.
+    Lève ValueError pour une sortie inconnue.
+    """
+    output = output or settings.output_default
+    if output not in OUTPUTS:
+        raise ValueError(f"Sortie inconnue : {output} ({', '.join(OUTPUTS)})")
+    opts = {**OUTPUTS[output].defaults, **settings.output_options(output)}
+    if quality is not None and "quality" in opts:
+        opts["quality"] = max(1, min(100, int(quality)))
+    if level is not None and "level" in opts:
+        opts["level"] = max(0, min(9 if output == "png" else 6, int(level)))
+    return {"output": output, **opts}
+
+def encode_image(img, encoding: Optional[dict] = None) -> bytes:
+    encoding = encoding or encoding_options()
+    buf = io.BytesIO()
+    OUTPUTS[encoding["output"]].encoder(img, buf, encoding)
+    return buf.getvalue()
+
+def media_type(encoding: dict) -> str:
+    return OUTPUTS[encoding["output"]].media_type
+
+def extension(encoding: dict) -> str:
+    return OUTPUTS[encoding["output"]].extension
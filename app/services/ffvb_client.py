@@ -0,0 +1,313 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional, Protocol
+import httpx
+from app.core.config import settings
+from app.services.metrics import metrics, span
+
+# ---- Réponses ----
+
+@dataclass
+class FFVBResponse:
+    status_code: int
+    content_type: str
+    content: bytes
+    from_cache: bool = False
+    headers: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.headers.setdefault("Content-Type", self.content_type)
+
+    @property
+    def text(self):
+        return self.content.decode("latin1")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(f"HTTP {self.status_code}", request=None, response=None)
+
+@dataclass
+class FFVBStream:
+    """Réponse lue au fil de l'eau : `chunks` à consommer une seule fois."""
+    status_code: int
+    content_type: str
+    chunks: Iterator[bytes]
+    from_cache: bool = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(f"HTTP {self.status_code}", request=None, response=None)
+
+# ---- Backends de cache ----
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[FFVBResponse]: ...
+    def set(self, key: str, response: FFVBResponse, ttl: int) -> None: ...
+
+class NoCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, response, ttl):
+        pass
+
+class MemoryCache:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                self._entries.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key, response, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, response)
+
+class SqliteCache:
+    """Cache HTTP persistant (remplace le requests_cache installé globalement)."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, status INTEGER, content_type TEXT, content BLOB, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, content_type, content, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[3] < time.time():
+            return None
+        return FFVBResponse(row[0], row[1], row[2])
+
+    def set(self, key, response, ttl):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, response.status_code, response.content_type, response.content, time.time() + ttl),
+            )
+            self._conn.commit()
+
+def make_cache(backend: str, path: str) -> CacheBackend:
+    if backend == "sqlite":
+        return SqliteCache(path)
+    if backend == "memory":
+        return MemoryCache()
+    return NoCache()
+
+# ---- Client ----
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    url: str
+    method: str = "POST"
+    timeout: float = 20
+    retries: int = 2
+    ttl: int = 600
+
+class FFVBClient:
+    """
+    Client HTTP unique pour les endpoints FFVB : connexions persistantes
+    (httpx), timeouts et retries par endpoint, cache enfichable.
+    Expose une API async (routes async) et une API sync (threads de rendu),
+    qui partagent la même politique et le même cache.
+    """
+    RETRY_STATUS = {500, 502, 503, 504}
+
+    def __init__(self, endpoints: dict, cache: CacheBackend, max_connections: int = 20, transport=None):
+        self.endpoints = endpoints
+        self.cache = cache
+        self.transport = transport
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._client = None
+        self._aclient = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # -- clients httpx créés à la demande --
+    def _sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(limits=self._limits, transport=self.transport)
+            return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(limits=self._limits, transport=self.transport)
+        return self._aclient
+
+    @staticmethod
+    def _cache_key(policy: EndpointPolicy, params: dict) -> str:
+        payload = policy.method + " " + policy.url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _build(self, policy, params):
+        if policy.method == "GET":
+            return dict(method="GET", url=policy.url, params=params)
+        return dict(method="POST", url=policy.url, data=params,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"})
+
+    @staticmethod
+    def _wrap(r: httpx.Response) -> FFVBResponse:
+        return FFVBResponse(r.status_code, r.headers.get("Content-Type", ""), r.content)
+
+    @staticmethod
+    def _record(endpoint: str, outcome):
+        """outcome : statut HTTP, ou nom de l'exception de transport."""
+        metrics.inc("ffvb_upstream_requests_total", endpoint=endpoint)
+        if isinstance(outcome, str) or outcome >= 400:
+            metrics.inc("ffvb_upstream_errors_total", endpoint=endpoint, reason=outcome)
+
+    def request(self, endpoint: str, params: dict, timeout: Optional[float] = None) -> FFVBResponse:
+        policy = self.endpoints[endpoint]
+        key = self._cache_key(policy, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            cached.from_cache = True
+            return cached
+        self.misses += 1
+
+        client = self._sync_client()
+        with span(f"ffvb_{endpoint}"):
+            for attempt in range(policy.retries + 1):
+                try:
+                    r = client.request(**self._build(policy, params), timeout=timeout or policy.timeout)
+                    self._record(endpoint, r.status_code)
+                    if r.status_code not in self.RETRY_STATUS or attempt == policy.retries:
+                        break
+                except httpx.TransportError as e:
+                    self._record(endpoint, type(e).__name__)
+                    if attempt == policy.retries:
+                        raise
+                time.sleep(0.5 * 2**attempt)
+
+        response = self._wrap(r)
+        if response.status_code == 200:
+            self.cache.set(key, response, policy.ttl)
+        return response
+
+    @contextmanager
+    def stream(self, endpoint: str, params: dict, timeout: Optional[float] = None, chunk_size: int = 64*1024):
+        """
+        Comme request, mais le corps est lu par morceaux pendant que
+        l'appelant le consomme (retries uniquement avant le premier octet).
+        Le corps complet n'est assemblé que pour alimenter le cache.
+        """
+        policy = self.endpoints[endpoint]
+        key = self._cache_key(policy, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            yield FFVBStream(cached.status_code, cached.content_type, iter([cached.content]), from_cache=True)
+            return
+        self.misses += 1
+
+        client = self._sync_client()
+        with span(f"ffvb_{endpoint}"):
+            for attempt in range(policy.retries + 1):
+                try:
+                    r = client.send(client.build_request(**self._build(policy, params), timeout=timeout or policy.timeout), stream=True)
+                    self._record(endpoint, r.status_code)
+                    if r.status_code not in self.RETRY_STATUS or attempt == policy.retries:
+                        break
+                    r.close()
+                except httpx.TransportError as e:
+                    self._record(endpoint, type(e).__name__)
+                    if attempt == policy.retries:
+                        raise
+                time.sleep(0.5 * 2**attempt)
+
+        content_type = r.headers.get("Content-Type", "")
+
+        def chunks():
+            body = []
+            for chunk in r.iter_bytes(chunk_size):
+                body.append(chunk)
+                yield chunk
+            if r.status_code == 200:
+                self.cache.set(key, FFVBResponse(r.status_code, content_type, b"".join(body)), policy.ttl)
+
+        try:
+            yield FFVBStream(r.status_code, content_type, chunks())
+        finally:
+            r.close()
+
+    async def arequest(self, endpoint: str, params: dict, timeout: Optional[float] = None) -> FFVBResponse:
+        policy = self.endpoints[endpoint]
+        key = self._cache_key(policy, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            cached.from_cache = True
+            return cached
+        self.misses += 1
+
+        client = self._async_client()
+        with span(f"ffvb_{endpoint}"):
+            for attempt in range(policy.retries + 1):
+                try:
+                    r = await client.request(**self._build(policy, params), timeout=timeout or policy.timeout)
+                    self._record(endpoint, r.status_code)
+                    if r.status_code not in self.RETRY_STATUS or attempt == policy.retries:
+                        break
+                except httpx.TransportError as e:
+                    self._record(endpoint, type(e).__name__)
+                    if attempt == policy.retries:
+                        raise
+                await asyncio.sleep(0.5 * 2**attempt)
+
+        response = self._wrap(r)
+        if response.status_code == 200:
+            self.cache.set(key, response, policy.ttl)
+        return response
+
+    async def aclose(self):
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+def _policy(name: str, url: str, method: str = "POST") -> EndpointPolicy:
+    conf = settings.http_endpoint(name)
+    return EndpointPolicy(
+        url=url,
+        method=method,
+        timeout=conf.get("timeout", 20),
+        retries=conf.get("retries", 2),
+        ttl=conf.get("ttl", settings.http_cache_ttl),
+    )
+
+# Instance par défaut
+ffvb_client = FFVBClient(
+    endpoints={
+        "csv": _policy("csv", settings.ffvb_csv_url),
+        "match_sheet": _policy("match_sheet", settings.ffvb_address_url),
+        "planning": _policy("planning", settings.ffvb_planning_url, method="GET"),
+    },
+    cache=make_cache(settings.http_cache_backend, settings.http_cache_path),
+    max_connections=settings.http_max_connections,
+)
+metrics.register_cache("http", lambda: (ffvb_client.hits, ffvb_client.misses))
@@ -1,18 +1,28 @@
 
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 
-def paste_image_fit_box(background, overlay_path, box_x, box_y, box_width, box_height):
-    overlay = Image.open(overlay_path).convert("RGBA")
+# Surface de mesure partagée (même mode RGBA que les fonds : mesures identiques)
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+def fit_image_to_box(overlay, box_width, box_height):
     original_width, original_height = overlay.size
     ratio = min(box_width / original_width, box_height / original_height)
     new_width = int(original_width * ratio)
     new_height = int(original_height * ratio)
-    overlay = overlay.resize((new_width, new_height), Image.LANCZOS)
+    return overlay.resize((new_width, new_height), Image.LANCZOS)
+
+def paste_centered_in_box(background, overlay, box_x, box_y, box_width, box_height):
+    new_width, new_height = overlay.size
     decal_x = box_x + (box_width - new_width) // 2
     decal_y = box_y + (box_height - new_height) // 2
     background.paste(overlay, (decal_x, decal_y), overlay)
     return background
 
+def paste_image_fit_box(background, overlay_path, box_x, box_y, box_width, box_height):
+    overlay = fit_image_to_box(Image.open(overlay_path).convert("RGBA"), box_width, box_height)
+    return paste_centered_in_box(background, overlay, box_x, box_y, box_width, box_height)
+
 def paste_image_with_fixed_width(background, overlay_path, dest_x, dest_y, fixed_width):
     overlay = Image.open(overlay_path).convert("RGBA")
     original_width, original_height = overlay.size
@@ -29,36 +39,43 @@ def paste_image_with_fixed_height(background, overlay_path, dest_x, dest_y, fixe
     background.paste(overlay, (dest_x, dest_y), overlay)
     return background
 
-def draw_centered_text_overlay(background_img, text, width, center_x, center_y, fnt, fill=(255,255,255,255), stroke_width=0, stroke_fill=(0,0,0,255)):
-    draw = ImageDraw.Draw(background_img)
+def _text_width(text, fnt):
+    bbox = _MEASURE_DRAW.textbbox((0, 0), text, font=fnt)
+    return bbox[2] - bbox[0]
 
-    def wrap_text_px(text, fnt, max_width, draw):
-        words = text.split()
-        lines = []
-        current = ""
-        for word in words:
-            test = current + " " + word if current else word
-            bbox = draw.textbbox((0, 0), test, font=fnt)
-            w = bbox[2] - bbox[0]
-            if w <= max_width:
-                current = test
-            else:
-                lines.append(current)
-                current = word
-        if current:
+@lru_cache(maxsize=4096)
+def layout_text(text, fnt, width):
+    """
+    Découpe `text` en lignes tenant dans `width` px.
+    Retourne (lignes, hauteur de ligne, largeurs des lignes), mémorisé par
+    (texte, police, largeur) : les polices du registre d'assets sont des
+    instances uniques par fichier et taille.
+    """
+    words = text.split()
+    lines = []
+    current = ""
+    for word in words:
+        test = current + " " + word if current else word
+        if _text_width(test, fnt) <= width:
+            current = test
+        else:
             lines.append(current)
-        return lines
+            current = word
+    if current:
+        lines.append(current)
+
+    top, bottom = fnt.getbbox("Hg")[1], fnt.getbbox("Hg")[3]
+    line_height = bottom - top + 5
+    return tuple(lines), line_height, tuple(_text_width(line, fnt) for line in lines)
+
+def draw_centered_text_overlay(background_img, text, width, center_x, center_y, fnt, fill=(255,255,255,255), stroke_width=0, stroke_fill=(0,0,0,255)):
+    draw = ImageDraw.Draw(background_img)
 
-    temp_img = Image.new("RGBA", (width, 1000))
-    temp_draw = ImageDraw.Draw(temp_img)
-    lines = wrap_text_px(text, fnt, width, temp_draw)
-    line_height = fnt.getbbox("Hg")[3] - fnt.getbbox("Hg")[1] + 5
+    lines, line_height, widths = layout_text(text, fnt, width)
     total_height = len(lines) * line_height
     y_start = int(center_y - total_height / 2)
 
-    for i, line in enumerate(lines):
-        bbox = draw.textbbox((0, 0), line, font=fnt)
-        w = bbox[2] - bbox[0]
+    for i, (line, w) in enumerate(zip(lines, widths)):
         x = int(center_x - w/2)
         y = y_start + i * line_height
         draw.text((x, y), line, font=fnt, fill=fill, stroke_width=stroke_width, stroke_fill=stroke_fill)
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+from PIL import Image
+from app.core.config import settings
+from app.services.metrics import metrics
+
+def image_bytes(img: Image.Image) -> int:
+    return img.width * img.height * len(img.getbands())
+
+class ImageCache:
+    """
+    Cache LRU d'images décodées (calques de rendu), borné en octets de pixels.
+    Les images stockées sont partagées : l'appelant travaille sur une copie
+    (`.copy()`) s'il doit dessiner dessus. `sizeof` mesure une entrée qui
+    n'est pas une image unique.
+    """
+    def __init__(self, max_bytes: int, sizeof=image_bytes):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[object, Image.Image]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            img = self._entries.get(key)
+            if img is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return img
+
+    def put(self, key, img: Image.Image):
+        size = self.sizeof(img)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= self.sizeof(old)
+            self._entries[key] = img
+            self._size += size
+            while self._size > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._size -= self.sizeof(dropped)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+# Instance par défaut : fonds + titre + période (cf. image_gen.header_layer)
+header_layers = ImageCache(settings.header_cache_max_bytes)
+metrics.register_cache("header", lambda: (header_layers.hits, header_layers.misses))
+
+# Lignes de match prêtes à coller (cf. image_gen.row_tile, layout.Tile)
+row_tiles = ImageCache(settings.tile_cache_max_bytes, sizeof=lambda t: image_bytes(t.content) + image_bytes(t.keep))
+metrics.register_cache("tiles", lambda: (row_tiles.hits, row_tiles.misses))
@@ -0,0 +1,229 @@
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+from PIL import Image, ImageChops
+from app.services.assets import get_fonts, get_banner, get_icon, get_club_logo, assets_version
+from app.services.image_utils import paste_centered_in_box, draw_centered_text_overlay
+
+# Description des visuels en unités de base (multipliées par le multiplicateur
+# à la compilation). Une opération lit sa valeur dans les champs de la ligne
+# (cf. image_gen.row_values) et ne dessine rien si le champ vaut None.
+# Les `dy` sont relatifs au haut de la ligne (ou de l'image pour l'entête).
+
+BLACK = (0, 0, 0, 255)
+WHITE = (255, 255, 255, 255)
+
+@dataclass(frozen=True)
+class Text:
+    field: str
+    width: int
+    cx: int
+    dy: int
+    font: str
+    fill: tuple = WHITE
+    stroke_width: int = 0
+    stroke_fill: tuple = BLACK
+    font_field: Optional[str] = None   # champ donnant le nom de police (ex. pseudo d'équipe)
+    fill_field: Optional[str] = None   # champ donnant la couleur
+    fonts: Optional[dict] = None       # compilé : polices du multiplicateur (si font_field)
+
+    def compile(self, m, fonts):
+        return replace(self, width=self.width*m, cx=self.cx*m, dy=self.dy*m,
+                       font=fonts[self.font], fonts=fonts if self.font_field else None)
+
+    def draw(self, canvas, values, top):
+        text = values.get(self.field)
+        if text is None:
+            return canvas
+        fnt = self.fonts[values[self.font_field]] if self.font_field else self.font
+        fill = values[self.fill_field] if self.fill_field else self.fill
+        return draw_centered_text_overlay(canvas, text, self.width, self.cx, top + self.dy, fnt,
+                                          fill=fill, stroke_width=self.stroke_width, stroke_fill=self.stroke_fill)
+
+@dataclass(frozen=True)
+class Banner:
+    field: str
+    x: int
+    dy: int
+    m: int = 1
+
+    def compile(self, m, fonts):
+        return replace(self, x=self.x*m, dy=self.dy*m, m=m)
+
+    def draw(self, canvas, values, top):
+        name = values.get(self.field)
+        if name is not None:
+            overlay = get_banner(name, self.m)
+            canvas.paste(overlay, (self.x, top + self.dy), overlay)
+        return canvas
+
+@dataclass(frozen=True)
+class Logo:
+    field: str
+    x: int
+    dy: int
+    width: int
+    height: int
+
+    def compile(self, m, fonts):
+        return replace(self, x=self.x*m, dy=self.dy*m, width=self.width*m, height=self.height*m)
+
+    def draw(self, canvas, values, top):
+        code = values.get(self.field)
+        if code is None:
+            return canvas
+        return paste_centered_in_box(canvas, get_club_logo(code, self.width, self.height),
+                                     self.x, top + self.dy, self.width, self.height)
+
+@dataclass(frozen=True)
+class Icon:
+    field: str
+    x: int
+    dy: int
+    size: int
+
+    def compile(self, m, fonts):
+        return replace(self, x=self.x*m, dy=self.dy*m, size=self.size*m)
+
+    def draw(self, canvas, values, top):
+        name = values.get(self.field)
+        if name is not None:
+            overlay = get_icon(name, self.size)
+            canvas.paste(overlay, (self.x, top + self.dy), overlay)
+        return canvas
+
+@dataclass(frozen=True)
+class Picture:
+    """Image déjà produite à l'échelle du rendu (ex. grille des scores), sans masque."""
+    field: str
+    x: int
+    dy: int
+
+    def compile(self, m, fonts):
+        return replace(self, x=self.x*m, dy=self.dy*m)
+
+    def draw(self, canvas, values, top):
+        img = values.get(self.field)
+        if img is not None:
+            canvas.paste(img, (self.x, top + self.dy))
+        return canvas
+
+@dataclass(frozen=True)
+class Layout:
+    header: Tuple
+    rows: Tuple
+    row_top: int
+    row_height: int
+
+# ---- Visuels ----
+
+HEADER = (
+    Text("title", 1030, 660, 68, "title", fill=(66,66,66,255)),
+    Text("period", 1030, 860, 130, "date_title", fill=(253,197,5,255)),
+)
+
+ROW_COMMON = (
+    Banner("banner", 20, 0),
+    Text("niveau", 115, 95, 15, "bold_15", stroke_width=1),
+    Text("type", 115, 95, 40, "bold_15", stroke_width=1),
+    Text("label", 115, 95, 60, "bold_15", stroke_width=1),
+    Logo("logo_a", 170, 5, 65, 65),
+    Text("team_a", 120, 310, 35, "bold_15", fill=BLACK, font_field="team_a_font"),
+    Logo("logo_b", 425, 5, 65, 65),
+    Text("team_b", 120, 560, 35, "bold_15", fill=BLACK, font_field="team_b_font"),
+)
+
+ROW_RESULTS = ROW_COMMON + (
+    Text("victory", 200, 705, 38, "victory", fill_field="victory_fill"),
+    Text("sets", 100, 828, 38, "sets", fill=(10,58,128,255)),
+    Picture("score_grid", 876, 2),
+)
+
+ROW_PLANNING = ROW_COMMON + (
+    Text("date", 100, 705, 35, "bold_15"),
+    Text("place_nom", 210, 882, 17, "bold_14", stroke_width=1),
+    Text("place_adr", 210, 882, 37, "bold_12", stroke_width=1),
+    Text("place_ville", 210, 882, 57, "bold_15", stroke_width=1),
+    Icon("place_type", 995, 20, 40),
+)
+
+# format -> mode -> Layout ; "default" sert aux formats sans description propre.
+# L'entête doit être le même pour tous les modes d'un format : son calque est
+# mis en cache par format (image_gen.header_layer).
+LAYOUTS = {
+    "default": {
+        "results": Layout(HEADER, ROW_RESULTS, row_top=200, row_height=80),
+        "planning": Layout(HEADER, ROW_PLANNING, row_top=200, row_height=80),
+    },
+}
+
+# ---- Plan de rendu ----
+
+class Tile(NamedTuple):
+    """
+    Ligne dessinée hors du fond. Chaque opération (paste avec masque, texte)
+    interpole chaque canal vers sa source : leur empilement se réduit à
+    `fond * keep / 255 + content`, rejouable sur n'importe quel fond. Pas
+    bit à bit : les arrondis diffèrent d'au plus 1 par canal sur les pixels
+    antialiasés (cf. tests/test_layout.py).
+    """
+    content: Image.Image   # ligne dessinée sur (0, 0, 0, 0)
+    keep: Image.Image      # "L" : part du fond conservée (255 = intact)
+    x: int
+    dy: int                # relatif au haut de la ligne
+
+@dataclass(frozen=True)
+class RenderPlan:
+    header: Tuple
+    rows: Tuple
+    row_top: int
+    row_height: int
+
+    def draw_header(self, canvas, values):
+        for op in self.header:
+            canvas = op.draw(canvas, values, 0)
+        return canvas
+
+    def draw_row(self, canvas, values, top):
+        for op in self.rows:
+            canvas = op.draw(canvas, values, top)
+        return canvas
+
+    def draw_tile(self, values, width):
+        """Ligne seule, rognée à ce qu'elle dessine (texte débordant compris)."""
+        margin = self.row_height
+        size = (width, self.row_height + 2 * margin)
+        content = self.draw_row(Image.new("RGBA", size, (0, 0, 0, 0)), values, margin)
+        white = self.draw_row(Image.new("RGBA", size, (255, 255, 255, 255)), values, margin)
+        keep = ImageChops.subtract(white, content).getchannel("A")
+        box = ImageChops.invert(keep).getbbox() or (0, 0, 1, 1)
+        return Tile(content.crop(box), keep.crop(box), box[0], box[1] - margin)
+
+    def paste_tile(self, canvas, tile, top):
+        box = (tile.x, top + tile.dy, tile.x + tile.content.width, top + tile.dy + tile.content.height)
+        keep = Image.merge("RGBA", (tile.keep,) * 4)
+        canvas.paste(ImageChops.add(tile.content, ImageChops.multiply(canvas.crop(box), keep)), box)
+        return canvas
+
+    def row_tops(self, count):
+        return [self.row_top + i * self.row_height for i in range(count)]
+
+@lru_cache(maxsize=64)
+def _compile(format, mode, multiplier, assets):
+    layouts = LAYOUTS.get(format, LAYOUTS["default"])
+    layout = layouts.get(mode, layouts["planning"])
+    m = multiplier
+    fonts = get_fonts(m)
+    return RenderPlan(
+        header=tuple(op.compile(m, fonts) for op in layout.header),
+        rows=tuple(op.compile(m, fonts) for op in layout.rows),
+        row_top=layout.row_top * m,
+        row_height=layout.row_height * m,
+    )
+
+def get_plan(format: str = "pub", mode: str = "planning", multiplier: int = 2) -> RenderPlan:
+    """
+    Visuel du format/mode compilé pour un multiplicateur : boîtes en pixels,
+    polices résolues. Recompilé quand les assets changent.
+    """
+    return _compile(format, mode, multiplier, assets_version())
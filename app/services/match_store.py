@@ -0,0 +1,213 @@
+import hashlib
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from app.core.config import settings
+from app.services.data_provider import parse_csv_rows
+from app.services.metrics import span
+from app.services.single_flight import SingleFlight
+
+@dataclass(frozen=True)
+class Match:
+    index: int          # position dans l'export FFVB (ordre d'affichage)
+    entity: str
+    codmatch: str
+    date: datetime
+    hour: str           # "" si l'horaire n'est pas connu (00:00)
+    cat_code: str
+    logo_a: str
+    team_a: str
+    logo_b: str
+    team_b: str
+    sets: str
+    score: str
+    place: str
+
+def match_from_row(index, row):
+    """Ligne brute du CSV -> Match, ou None pour l'entête / les lignes 'xxxxx'."""
+    if row[3] == 'Date' or row[6] == 'xxxxx':
+        return None
+    return Match(
+        index=index,
+        entity=row[0],
+        codmatch=row[2],
+        date=datetime.fromisoformat(row[3]),
+        hour="" if row[4] == "00:00" else row[4],
+        cat_code=row[2][:3],
+        logo_a=row[5], team_a=row[6],
+        logo_b=row[7], team_b=row[8],
+        sets=row[9], score=row[10],
+        place=row[12],
+    )
+
+class _DateIndex:
+    """Matchs triés par date, interrogeables par intervalle via bisect."""
+    def __init__(self, matches):
+        self.matches = sorted(matches, key=lambda mt: (mt.date, mt.index))
+        self.dates = [mt.date for mt in self.matches]
+
+    def between(self, date_start=None, date_end=None):
+        lo = bisect_left(self.dates, date_start) if date_start else 0
+        hi = bisect_right(self.dates, date_end) if date_end else len(self.dates)
+        return self.matches[lo:hi]
+
+class SeasonMatches:
+    """Instantané immuable des matchs d'une saison, indexé par date et par catégorie."""
+    def __init__(self, saison, matches, version):
+        self.saison = saison
+        self.matches = matches
+        self.version = version
+        self.loaded_at = time.time()
+        self._by_date = _DateIndex(matches)
+        groups = {}
+        for mt in matches:
+            groups.setdefault(mt.cat_code, []).append(mt)
+        self._by_category = {cat: _DateIndex(group) for cat, group in groups.items()}
+
+    @property
+    def categories(self):
+        return list(self._by_category)
+
+    def query(self, date_start=None, date_end=None, categories=None):
+        """Matchs de l'intervalle [date_start, date_end] (et des catégories), dans l'ordre de l'export."""
+        if categories:
+            found = []
+            for cat in dict.fromkeys(categories):
+                index = self._by_category.get(cat)
+                if index:
+                    found.extend(index.between(date_start, date_end))
+        else:
+            found = self._by_date.between(date_start, date_end)
+        return sorted(found, key=lambda mt: mt.index)
+
+def scan_matches(rows, date_start=None, date_end=None, categories=None, saison=""):
+    """
+    Matchs des lignes brutes, dans l'ordre de l'export. Les filtres sont
+    testés sur les champs bruts (date ISO, préfixe du code match) : une
+    ligne écartée ne produit ni datetime ni Match.
+    """
+    start = date_start.strftime("%Y-%m-%d") if date_start else None
+    end = date_end.strftime("%Y-%m-%d") if date_end else None
+    categories = set(categories) if categories else None
+    for i, row in enumerate(rows):
+        try:
+            if (start and row[3][:10] < start) or (end and row[3][:10] > end) \
+                    or (categories and row[2][:3] not in categories):
+                continue
+            mt = match_from_row(i, row)
+        except (IndexError, ValueError) as e:
+            print(f"Ligne CSV ignorée ({saison} #{i}): {e}")
+            continue
+        if mt:
+            yield mt
+
+def _digest_rows(rows, digest):
+    for row in rows:
+        digest.update(";".join(row).encode("utf-8"))
+        digest.update(b"\n")
+        yield row
+
+# Chargements simultanés d'un même export : un seul téléchargement + parsing
+_csv_flight = SingleFlight("csv")
+
+def load_season(saison, rows=None, date_start=None, date_end=None, categories=None):
+    """
+    Instantané des matchs de la saison, lu en flux depuis l'export FFVB
+    (ou depuis `rows`). Avec des filtres (datetimes, codes catégorie),
+    seuls les matchs retenus sont construits : instantané partiel, pour
+    une requête ponctuelle hors du MatchStore.
+    """
+    if rows is None:
+        key = (saison, date_start, date_end, tuple(sorted(categories or ())))
+        return _csv_flight.do(key, _load_season, saison, None, date_start, date_end, categories)
+    return _load_season(saison, rows, date_start, date_end, categories)
+
+def _load_season(saison, rows, date_start, date_end, categories):
+    digest = hashlib.sha1()
+    # version : empreinte des octets de l'export (ou des lignes fournies)
+    rows = parse_csv_rows(saison, digest) if rows is None else _digest_rows(rows, digest)
+    with span("csv_parse"):
+        matches = list(scan_matches(rows, date_start, date_end, categories, saison))
+    version = digest.hexdigest()[:16]
+    if date_start or date_end or categories:
+        version += "-" + hashlib.sha1(repr((date_start, date_end, sorted(categories or ()))).encode("utf-8")).hexdigest()[:8]
+    return SeasonMatches(saison, matches, version)
+
+def _parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+class MatchStore:
+    """
+    Matchs par saison, rechargés en arrière-plan après `ttl` secondes.
+    Le rechargement construit un nouvel instantané puis remplace la
+    référence d'un coup : un rendu en cours garde un jeu de données cohérent.
+    """
+    def __init__(self, ttl: int = 600, loader=load_season):
+        self.ttl = ttl
+        self._loader = loader
+        self._seasons = {}
+        self._locks = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(saison):
+        return (saison or "").replace("/", "-")
+
+    def _season_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, saison) -> SeasonMatches:
+        key = self._key(saison)
+        snapshot = self._seasons.get(key)
+        if snapshot is None:
+            # Premier accès : chargement synchrone (un seul chargement par saison)
+            with self._season_lock(key):
+                snapshot = self._seasons.get(key)
+                if snapshot is None:
+                    snapshot = self.refresh(saison)
+        elif time.time() - snapshot.loaded_at > self.ttl:
+            self.refresh_in_background(saison)
+        return snapshot
+
+    def for_query(self, saison, date_start=None, date_end=None, categories=None) -> SeasonMatches:
+        """
+        Instantané pour une requête (dates "YYYY-MM-DD") : celui du store pour
+        les saisons suivies (club.saisons, ou déjà chargées), sinon un
+        chargement filtré, non conservé (saison d'archive demandée ponctuellement).
+        """
+        key = self._key(saison)
+        if key in self._seasons or key in {self._key(s) for s in settings.club_saisons}:
+            return self.get(saison)
+        return load_season(key, date_start=_parse_day(date_start), date_end=_parse_day(date_end), categories=categories)
+
+    def refresh(self, saison) -> SeasonMatches:
+        key = self._key(saison)
+        snapshot = self._loader(key)
+        self._seasons[key] = snapshot
+        return snapshot
+
+    def refresh_in_background(self, saison):
+        key = self._key(saison)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.refresh(saison)
+            except Exception as e:
+                # on garde l'instantané précédent
+                print(f"Erreur rechargement matchs {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"match-store-{key}", daemon=True).start()
+
+# Instance par défaut
+match_store = MatchStore(ttl=settings.matches_ttl)
@@ -0,0 +1,166 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Bornes (secondes) des histogrammes de durée
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels.items()) + "}"
+
+class Metrics:
+    """
+    Registre de métriques en mémoire (processus courant), exporté au format
+    texte Prometheus par /metrics : histogrammes de durée, compteurs, et
+    ratios de succès des caches lus à la demande.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}   # (nom, labels) -> Histogram
+        self._counters = {}     # (nom, labels) -> valeur
+        self._help = {}
+        self._caches = {}       # nom -> fonction () -> (hits, misses)
+
+    @staticmethod
+    def _key(name, labels):
+        # valeurs en texte : un même label peut recevoir un statut (int) ou un nom d'exception
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name, help):
+        self._help[name] = help
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            key = self._key(name, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            key = self._key(name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_cache(self, name, stats):
+        """`stats` : fonction sans argument retournant (hits, misses)."""
+        self._caches[name] = stats
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        current = None
+        for (name, labels), h in histograms:
+            if name != current:
+                header(name, "histogram")
+                current = name
+            labels = dict(labels)
+            cumulative = 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {h.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {h.sum:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {h.count}")
+
+        current = None
+        for (name, labels), value in counters:
+            if name != current:
+                header(name, "counter")
+                current = name
+            lines.append(f"{name}{_labels(dict(labels))} {value}")
+
+        if self._caches:
+            stats = {name: fn() for name, fn in sorted(self._caches.items())}
+            header("ffvb_cache_hits_total", "counter")
+            lines += [f"ffvb_cache_hits_total{_labels({'cache': n})} {h}" for n, (h, _) in stats.items()]
+            header("ffvb_cache_misses_total", "counter")
+            lines += [f"ffvb_cache_misses_total{_labels({'cache': n})} {m}" for n, (_, m) in stats.items()]
+            header("ffvb_cache_hit_ratio", "gauge")
+            lines += [f"ffvb_cache_hit_ratio{_labels({'cache': n})} {h / (h + m) if h + m else 0:.4f}"
+                      for n, (h, m) in stats.items()]
+        return "\n".join(lines) + "\n"
+
+# ---- Spans ----
+
+class Trace:
+    """Durées cumulées par étape pour une requête (en-tête Server-Timing)."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, duration):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    def server_timing(self) -> str:
+        with self._lock:
+            spans = list(self.spans.items())
+        spans.append(("total", time.perf_counter() - self.started))
+        return ", ".join(f"{name};dur={duration * 1000:.1f}" for name, duration in spans)
+
+_current_trace: ContextVar = ContextVar("ffvb_trace", default=None)
+
+@contextmanager
+def trace():
+    """Active une Trace pour le contexte courant (une requête)."""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+@contextmanager
+def span(stage):
+    """
+    Mesure une étape : alimente l'histogramme ffvb_stage_seconds{stage} et,
+    si une Trace est active, l'en-tête Server-Timing de la requête.
+    Les threads auxiliaires n'héritent de la Trace que si on leur passe le
+    contexte (contextvars.copy_context).
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(stage, time.perf_counter() - t0)
+
+def record_span(stage, duration):
+    """Enregistre une durée mesurée ailleurs (ex. dans un processus de rendu)."""
+    metrics.observe("ffvb_stage_seconds", duration, stage=stage)
+    current = _current_trace.get()
+    if current is not None:
+        current.add(stage, duration)
+
+# Instance par défaut
+metrics = Metrics()
+metrics.describe("ffvb_stage_seconds", "Durée des étapes de rendu et de récupération des données")
+metrics.describe("ffvb_request_seconds", "Durée des requêtes HTTP servies")
+metrics.describe("ffvb_upstream_requests_total", "Requêtes envoyées aux endpoints FFVB")
+metrics.describe("ffvb_upstream_errors_total", "Erreurs des endpoints FFVB (transport ou statut HTTP)")
+metrics.describe("ffvb_cache_hit_ratio", "Part des lectures servies par le cache")
@@ -0,0 +1,81 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+APP_DIR = str(Path(__file__).resolve().parent.parent)  # == app/
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(APP_DIR):
+        filename = "app" + filename[len(APP_DIR):]
+    else:
+        filename = Path(filename).name
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class StackSampler:
+    """
+    Profileur par échantillonnage (stdlib) : relève toutes les `interval`
+    secondes la pile des threads qui exécutent du code de l'application
+    (thread de la requête et téléchargements parallèles des adresses).
+    Un rendu concurrent sur une autre requête apparaîtrait aussi.
+    """
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self, own):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            in_app = False
+            while frame is not None:
+                in_app = in_app or frame.f_code.co_filename.startswith(APP_DIR)
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if in_app:
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Format « collapsed stacks » (flamegraph.pl, speedscope)."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+def profile_sampling(fn, interval: float = 0.005) -> str:
+    with StackSampler(interval) as sampler:
+        fn()
+    return sampler.collapsed()
+
+def profile_deterministic(fn, limit: int = 80) -> str:
+    """cProfile : thread appelant uniquement, trié par temps cumulé."""
+    profiler = cProfile.Profile()
+    profiler.runcall(fn)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+PROFILERS = {
+    "collapsed": profile_sampling,
+    "cprofile": profile_deterministic,
+}
@@ -0,0 +1,100 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from app.core.config import settings
+from app.services.assets import warm_assets, assets_version
+from app.services.image_gen import generate_filtered_image, select_matches, drawn_addresses
+from app.services.match_store import SeasonMatches, match_store
+from app.services.render_cache import render_cache
+from app.services.metrics import span, trace, record_span
+from app.services.encoding import encode_image, encoding_options
+from app.services.single_flight import SingleFlight
+
+# Rendu local (threads Starlette) ou dans un pool de processus (config render.backend)
+_pool = None
+_pool_lock = threading.Lock()
+
+# Rendus identiques demandés en même temps : dessinés une fois
+_render_flight = SingleFlight("render")
+
+def _render_job(job: dict, matches: list, addresses: dict, encoding: dict, assets: str = None) -> bytes:
+    # Exécuté dans le processus de rendu : uniquement la description du job
+    # et les matchs déjà sélectionnés traversent la frontière.
+    # `assets` : version des assets dans la clé du rendu ; un worker du pool
+    # qui a encore l'ancienne vide son registre avant de dessiner.
+    assets_version(assets)
+    snapshot = SeasonMatches(job["saison"], matches, version="")
+    img = generate_filtered_image(**job, snapshot=snapshot, addresses=addresses)
+    with span("encode"):
+        return encode_image(img, encoding)
+
+def _render_job_traced(job: dict, matches: list, addresses: dict, encoding: dict, assets: str = None):
+    # Pool de processus : les durées des étapes reviennent avec l'image
+    with trace() as current:
+        data = _render_job(job, matches, addresses, encoding, assets)
+    return data, current.spans
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.render_workers,
+                # spawn : pas d'héritage des threads/connexions sqlite du parent
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_assets,
+                initargs=(settings.assets_preload_formats, settings.assets_preload_multipliers),
+            )
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def render_image(key, categories_filter=None, date_start=None, date_end=None, title=None, format="pub", mode="planning", saison=None, snapshot=None, addresses=None, use_cache=True, backend=None, encoding=None, preview=False) -> bytes:
+    """
+    Image encodée du rendu (`encoding`, cf. encoding_options ; PNG par
+    défaut), servie depuis le cache de rendus si possible.
+    `use_cache=False` force un rendu complet (profilage), `backend` remplace
+    le backend configuré. `preview` : rendu à preview.multiplier, adresses
+    lues dans l'index uniquement (aucune fiche match téléchargée ici).
+    Les appels simultanés de même clé partagent un seul rendu.
+    """
+    if use_cache:
+        data = render_cache.get(key)
+        if data is not None:
+            return data
+        return _render_flight.do(key, _render, key, categories_filter, date_start, date_end, title, format,
+                                 mode, saison, snapshot, addresses, use_cache, backend, encoding, preview)
+    return _render(key, categories_filter, date_start, date_end, title, format,
+                   mode, saison, snapshot, addresses, use_cache, backend, encoding, preview)
+
+def _render(key, categories_filter, date_start, date_end, title, format, mode, saison, snapshot, addresses, use_cache, backend, encoding, preview) -> bytes:
+    # Données et adresses sont toujours résolues ici (réseau, sqlite),
+    # le backend ne fait que dessiner et encoder.
+    snapshot = snapshot or match_store.for_query(saison, date_start, date_end, categories_filter)
+    matches = select_matches(snapshot, categories_filter, date_start, date_end)
+    if mode == "planning":
+        if addresses is None:
+            addresses = drawn_addresses(matches, preview)
+        addresses = {(mt.codmatch, mt.entity): addresses.get((mt.codmatch, mt.entity)) for mt in matches}
+    else:
+        addresses = {}
+
+    encoding = encoding or encoding_options()
+    job = dict(categories_filter=categories_filter, date_start=date_start, date_end=date_end,
+               title=title, format=format, mode=mode, saison=saison,
+               multiplier=settings.preview_multiplier if preview else 2)
+    if (backend or settings.render_backend) == "process":
+        data, spans = get_pool().submit(_render_job_traced, job, matches, addresses, encoding, assets_version()).result()
+        for stage, duration in spans.items():
+            record_span(stage, duration)
+    else:
+        data = _render_job(job, matches, addresses, encoding)
+
+    if use_cache:
+        render_cache.put(key, data)
+    return data
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import settings
+from app.services.metrics import metrics
+
+def make_key(**parts) -> str:
+    """Clé stable (sha256) à partir de paramètres normalisés et de versions."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class RenderCache:
+    """
+    Cache LRU des images encodées, borné en octets et en âge.
+    Les clés embarquent la version des données et des assets : une
+    modification en amont produit une nouvelle clé, les anciennes
+    entrées sortent d'elles-mêmes par l'LRU.
+    """
+    def __init__(self, max_bytes: int = 256*1024*1024, max_age: int = 24*3600):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] > self.max_age:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (data, time.time())
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def _drop(self, key: str):
+        data, _ = self._entries.pop(key)
+        self._size -= len(data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+# Instance par défaut
+render_cache = RenderCache(settings.render_cache_max_bytes, settings.render_cache_max_age)
+metrics.register_cache("render", lambda: (render_cache.hits, render_cache.misses))
@@ -0,0 +1,154 @@
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+try:
+    import fcntl
+except ImportError:   # Windows : pas de verrou, chaque worker exécute les jobs
+    fcntl = None
+from app.core.config import settings
+from app.services.data_provider import get_gymnase_addresses
+from app.services.image_gen import image_cache_key, select_matches, drawn_addresses
+from app.services.match_store import match_store
+from app.services.render_backend import render_image
+from app.services.encoding import encoding_options
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+def weekend_dates(today: date, period: str):
+    """
+    (samedi, dimanche) au format YYYY-MM-DD.
+    - next_weekend : week-end de la semaine en cours (comme l'interface web)
+    - last_weekend : dernier week-end commencé (celui en cours le samedi/dimanche)
+    """
+    monday = today - timedelta(days=today.weekday())
+    saturday = monday + timedelta(days=5)
+    if period == "last_weekend" and today.weekday() < 5:
+        saturday -= timedelta(days=7)
+    sunday = saturday + timedelta(days=1)
+    return saturday.isoformat(), sunday.isoformat()
+
+def _job_saison(job):
+    # club.saisons est au format "2025/2026" ; saisons.yaml et le cache au format "2025-2026"
+    return (job.get("saison") or settings.club_saisons[-1]).replace("/", "-")
+
+def _in_window(job, now: datetime) -> bool:
+    days = job.get("days")
+    if days and DAYS[now.weekday()] not in days:
+        return False
+    hours = job.get("hours")
+    if hours and not (hours[0] <= now.hour < hours[1]):
+        return False
+    return True
+
+# ---- Actions ----
+
+def refresh_matches(job):
+    for saison in job.get("saisons") or settings.club_saisons:
+        match_store.refresh(saison)
+
+def prefetch_venues(job):
+    saison = _job_saison(job)
+    date_start, date_end = weekend_dates(date.today(), job.get("period", "next_weekend"))
+    matches = select_matches(match_store.get(saison), job.get("categories"), date_start, date_end)
+    get_gymnase_addresses(
+        [(mt.codmatch, mt.entity) for mt in matches],
+        max_workers=settings.ffvb_address_concurrency,
+        timeout=settings.ffvb_address_timeout,
+    )
+
+def prerender(job):
+    """
+    Rend à l'avance ce que l'interface demande sans saisie : titre vide
+    (défaut "Matchs" de /image), toutes les catégories de la saison
+    (sélectionnées au chargement), aperçu JPEG à l'ouverture puis pleine
+    qualité au submit (Accept */* : sortie par défaut de la config).
+    """
+    saison = _job_saison(job)
+    date_start, date_end = weekend_dates(date.today(), job.get("period", "next_weekend"))
+    categories = job.get("categories") or list(settings.saisons.get(saison) or {}) or None
+    params = (categories, date_start, date_end, job.get("title", "Matchs"),
+              job.get("format", "pub"), job.get("mode", "planning"), saison)
+    snapshot = match_store.get(saison)
+    matches = select_matches(snapshot, categories, date_start, date_end)
+    # pleine qualité d'abord : ses adresses résolues sont ensuite celles de l'aperçu
+    for preview, output in ((False, job.get("output")), (True, "jpeg")):
+        encoding = encoding_options(output)
+        addresses = drawn_addresses(matches, preview) if params[5] == "planning" else None
+        key = image_cache_key(*params, snapshot=snapshot, encoding=encoding, preview=preview, addresses=addresses)
+        render_image(key, *params, snapshot=snapshot, addresses=addresses, encoding=encoding, preview=preview)
+
+ACTIONS = {
+    "refresh_matches": refresh_matches,
+    "prefetch_venues": prefetch_venues,
+    "prerender": prerender,
+}
+
+class Scheduler:
+    """
+    Tâches périodiques dans la boucle de l'application : chaque job tourne
+    toutes les `every` secondes (+ gigue aléatoire pour étaler les appels
+    FFVB), seulement dans sa fenêtre de jours/heures.
+    """
+    def __init__(self, jobs: list, jitter: int = 60, lock_path=None):
+        self.jobs = jobs
+        self.jitter = jitter
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._tasks = []
+
+    def _acquire(self) -> bool:
+        """
+        Un seul worker uvicorn exécute les jobs : verrou exclusif non bloquant
+        sur lock_path, tenu jusqu'à stop() (libéré par le système si le
+        processus meurt).
+        """
+        if not self.lock_path or fcntl is None:
+            return True
+        Path(self.lock_path).parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.lock_path, "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        return True
+
+    async def _run(self, job):
+        action = ACTIONS[job["action"]]
+        name = job.get("name", job["action"])
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        while True:
+            if _in_window(job, datetime.now()):
+                try:
+                    await asyncio.to_thread(action, job)
+                    print(f"[SCHEDULER] {name} OK")
+                except Exception as e:
+                    print(f"[SCHEDULER] {name} en erreur: {e}")
+            await asyncio.sleep(job.get("every", 3600) + random.uniform(0, self.jitter))
+
+    def start(self):
+        if not self.jobs:
+            return
+        if not self._acquire():
+            print(f"[SCHEDULER] jobs déjà exécutés par un autre worker ({self.lock_path})")
+            return
+        for job in self.jobs:
+            if job.get("action") not in ACTIONS:
+                print(f"[SCHEDULER] action inconnue: {job.get('action')}")
+                continue
+            self._tasks.append(asyncio.create_task(self._run(job)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+# Instance par défaut
+scheduler = Scheduler(settings.scheduler_jobs if settings.scheduler_enabled else [], settings.scheduler_jitter,
+                      settings.scheduler_lock_path)
@@ -1,32 +1,64 @@
 
-from PIL import Image, ImageDraw, ImageFont
-from pathlib import Path
+from functools import lru_cache
+from PIL import Image, ImageDraw
+from app.services.assets import get_font, assets_version, NATIVE_MULTIPLIER
+from app.services.metrics import metrics
 
-BASE_PATH = Path(__file__).resolve().parent.parent
-ASSETS_DIR = BASE_PATH / "assets"
-FONTS_DIR = ASSETS_DIR / "fonts"
+SCORE_GRID_CACHE_SIZE = 512
 
-def format_sets(sets):
-    if not sets or '/' not in sets:
-        return sets
-    parts = sets.strip().split('/')
-    if len(parts) == 2 and all(part.strip().isdigit() for part in parts):
-        a, b = int(parts[0]), int(parts[1])
-        return f"{a} - {b}"
-    return sets
+# ---- Parsing ----
 
-def did_team_a_win(sets):
+@lru_cache(maxsize=1024)
+def parse_sets(sets):
+    """Sets gagnés "3/1" -> (3, 1) ; None si absent ou illisible."""
     if not sets or '/' not in sets:
         return None
     parts = sets.strip().split('/')
     if len(parts) == 2 and all(part.strip().isdigit() for part in parts):
-        a, b = int(parts[0]), int(parts[1])
-        if a == b:
-            return None
-        return a > b
+        return int(parts[0]), int(parts[1])
     return None
 
-def create_score_image(score):
+@lru_cache(maxsize=1024)
+def parse_score(score):
+    """Détail "25-18,23-25" -> ((25, 18), (23, 25)) ; les sets illisibles sont ignorés."""
+    sets = []
+    for s in (score or "").split(','):
+        try:
+            a, b = map(int, s.strip().split('-'))
+            sets.append((a, b))
+        except ValueError:
+            continue
+    return tuple(sets)
+
+# `parsed` : résultat de parse_sets(sets) déjà calculé par l'appelant
+
+def format_sets(sets, parsed=None):
+    parsed = parsed if parsed is not None else parse_sets(sets)
+    if parsed is None:
+        return sets
+    a, b = parsed
+    return f"{a} - {b}"
+
+def did_team_a_win(sets, parsed=None):
+    parsed = parsed if parsed is not None else parse_sets(sets)
+    if parsed is None:
+        return None
+    a, b = parsed
+    if a == b:
+        return None
+    return a > b
+
+# ---- Grille des scores ----
+
+def create_score_image(score, multiplier=NATIVE_MULTIPLIER):
+    """
+    Grille des sets du match, mémorisée par sets et échelle (image partagée :
+    ne pas dessiner dessus).
+    """
+    return _score_grid(parse_score(score), multiplier, assets_version())
+
+@lru_cache(maxsize=SCORE_GRID_CACHE_SIZE)
+def _score_grid(sets, multiplier, assets):
     FONT_SIZE = 40
     OFFSET_Y = -5
     COLOR_WIN_BG = (253, 197, 5)
@@ -34,14 +66,6 @@ def create_score_image(score):
     COLOR_LOSE_BG = (38, 38, 38)
     COLOR_LOSE_FG = (255, 255, 255)
 
-    sets = []
-    for s in score.split(','):
-        try:
-            a, b = map(int, s.strip().split('-'))
-            sets.append([a, b])
-        except ValueError:
-            continue
-
     set_count = len(sets)
     box_width, box_height = 61, 61
     padding, spacing = 6, 6
@@ -50,7 +74,7 @@ def create_score_image(score):
 
     image = Image.new("RGB", (width, height), "white")
     draw = ImageDraw.Draw(image)
-    font = ImageFont.truetype(FONTS_DIR / "OpenSans-ExtraBold.ttf", FONT_SIZE)
+    font = get_font("OpenSans-ExtraBold.ttf", FONT_SIZE)
     ascent, descent = font.getmetrics()
 
     for i, (a, b) in enumerate(sets):
@@ -75,4 +99,10 @@ def create_score_image(score):
         draw.rectangle([x, y_bottom, x + box_width, y_bottom + box_height], fill=bg_b)
         draw.text((b_x, b_y), b_text, fill=fg_b, font=font)
 
+    if multiplier != NATIVE_MULTIPLIER:
+        # aperçu : grille dessinée à l'échelle native puis réduite
+        image = image.resize((round(width * multiplier / NATIVE_MULTIPLIER),
+                              round(height * multiplier / NATIVE_MULTIPLIER)), Image.LANCZOS)
     return image
+
+metrics.register_cache("score_grids", lambda: _score_grid.cache_info()[:2])
@@ -1,18 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import sys
 import html
-import requests
 import re
 import unicodedata
+import asyncio
 from bs4 import BeautifulSoup
+from app.services.ffvb_client import ffvb_client
+from app.services.single_flight import AsyncSingleFlight
+from app.services.snapshot import snapshots
+from app.core.config import settings
 
 CODE_CLUB = "0775819"
 SAISONS = ["2023/2024", "2024/2025", "2025/2026"]
 
-BASE_URL = "https://www.ffvbbeach.org/ffvbapp/resu/planning_club_class.php"
-
 
 def _norm(s: str) -> str:
     """Uppercase + suppression des accents + trim."""
@@ -126,12 +127,23 @@ def detect_level(u: str) -> str:
         return "Championnat Loisir Compet'Lib"
     return "Championnat Départemental"
 
-def fetch_lines(code_club: str, saison: str):
+# Rafraîchissements simultanés (/update-config, démarrage) : une seule
+# requête FFVB par club et saison
+_planning_flight = AsyncSingleFlight("planning")
+
+async def afetch_lines(code_club: str, saison: str):
+    if settings.snapshot_enabled:
+        return parse_lines(snapshots.bundle(saison).planning_html())
+    return await _planning_flight.do((code_club, saison), _afetch_lines, code_club, saison)
+
+async def _afetch_lines(code_club: str, saison: str):
     params = {"cnclub": code_club, "saison": saison}
-    r = requests.get(BASE_URL, params=params, timeout=20)
+    r = await ffvb_client.arequest("planning", params)
     r.raise_for_status()
+    return parse_lines(r.content)
 
-    soup = BeautifulSoup(r.text, "html.parser")
+def parse_lines(content: bytes):
+    soup = BeautifulSoup(content, "html.parser")
 
     cells = soup.select("td.titrepoule")
 
@@ -144,41 +156,77 @@ def fetch_lines(code_club: str, saison: str):
 
     return lines
 
+import os
+import tempfile
 import yaml
 from pathlib import Path
 
-def generate_config_seasons(code_club: str, saisons: list, output_file: str = "saisons.yaml"):
-    data = {"saisons": {}}
+def build_season_entries(lines):
+    entries = {}
+    for line in lines:
+        code, title = split_code_title(line)
+        u = line.upper()
+
+        type_ = detect_type(u)
+        gender = detect_gender(u)
+        category = detect_category(u)
+        level = detect_level(u)
+        label = build_label(type_, gender, category)
+
+        entries[code] = {
+            "titre": title,
+            "type": type_,
+            "genre": gender,
+            "category": category,
+            "niveau": level,
+            "label": label,
+        }
+    return entries
+
+def _write_config(data, output_file: str):
+    # Écriture dans un fichier temporaire du même dossier puis os.replace :
+    # un lecteur voit l'ancien ou le nouveau fichier, jamais un fichier partiel.
+    output_path = Path(output_file)
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.resolve().parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yaml.dump(data, f, allow_unicode=True, sort_keys=False, indent=2)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _read_config(output_file: str) -> dict:
+    path = Path(output_file)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        doc = yaml.safe_load(f) or {}
+    saisons = doc.get("saisons", doc)
+    return saisons if isinstance(saisons, dict) else {}
+
+async def arefresh_config_seasons(code_club: str, saisons: list, output_file: str = "saisons.yaml") -> list:
+    """
+    Rafraîchit les saisons en parallèle sans écraser les données existantes :
+    une saison en erreur garde son contenu actuel, et le fichier n'est
+    réécrit (atomiquement) que si au moins une saison a changé.
+    Retourne la liste des saisons modifiées.
+    """
+    current = await asyncio.to_thread(_read_config, output_file)
+    fetched = await asyncio.gather(*(afetch_lines(code_club, saison) for saison in saisons), return_exceptions=True)
 
-    for saison in saisons:
+    updated = dict(current)
+    changed = []
+    for saison, lines in zip(saisons, fetched):
         saison_key = normalize_season(saison)
-        data["saisons"][saison_key] = {}
-
-        try:
-            lines = fetch_lines(code_club, saison)
-        except Exception as e:
-            data["saisons"][saison_key]["_error"] = f"{saison} fetch failed: {e}"
+        if isinstance(lines, Exception):
+            print(f"Saison {saison} non rafraîchie: {lines}")
             continue
-
-        for line in lines:
-            code, title = split_code_title(line)
-            u = line.upper()
-
-            type_ = detect_type(u)
-            gender = detect_gender(u)
-            category = detect_category(u)
-            level = detect_level(u)
-            label = build_label(type_, gender, category)
-
-            data["saisons"][saison_key][code] = {
-                "titre": title,
-                "type": type_,
-                "genre": gender,
-                "category": category,
-                "niveau": level,
-                "label": label,
-            }
-
-    output_path = Path(output_file)
-    with open(output_path, "w", encoding="utf-8") as f:
-        yaml.dump(data, f, allow_unicode=True, sort_keys=False, indent=2)
+        entries = build_season_entries(lines)
+        if current.get(saison_key) != entries:
+            updated[saison_key] = entries
+            changed.append(saison_key)
+
+    if changed:
+        await asyncio.to_thread(_write_config, {"saisons": updated}, output_file)
+    return changed
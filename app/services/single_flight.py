@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from app.services.metrics import metrics
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents de même clé : le premier exécute la
+    fonction, les suivants attendent et partagent son résultat (ou son
+    exception). Rien n'est gardé une fois l'appel terminé : ce n'est pas un
+    cache, seulement la déduplication des appels en cours.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            metrics.inc("ffvb_coalesced_total", call=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class AsyncSingleFlight:
+    """
+    SingleFlight pour coroutines, dans une boucle d'événements : les appels
+    concurrents de même clé attendent la même tâche. L'annulation d'un
+    appelant (client parti) n'annule pas la tâche partagée.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda done: self._tasks.pop(key, None) if self._tasks.get(key) is done else None)
+            self.calls += 1
+        else:
+            self.shared += 1
+            metrics.inc("ffvb_coalesced_total", call=self.name)
+        return await asyncio.shield(task)
+
+metrics.describe("ffvb_coalesced_total", "Appels évités : appelants ayant partagé un appel identique déjà en cours")
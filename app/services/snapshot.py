@@ -0,0 +1,223 @@
+"""
+Snapshots FFVB : données d'une saison figées dans un bundle local versionné,
+servies à la place du site FFVB quand snapshot.enabled est vrai (dev local,
+benchmarks reproductibles, FFVB indisponible un week-end de tournoi).
+
+    python -m app.services.snapshot record --saison 2025/2026 [--pdfs 200]
+    python -m app.services.snapshot list
+
+Arborescence : <snapshot.dir>/<saison>/<version>/
+    manifest.json   saison, version, date d'enregistrement, compteurs
+    export.csv      export CSV tel que renvoyé par la FFVB (latin-1)
+    planning.html   page des poules (saisons.yaml)
+    pdfs/<codmatch>_<codent>.pdf
+    venues.json     adresses déjà extraites des PDF ("<codmatch>_<codent>" -> adresse ou null)
+"""
+import argparse
+import csv
+import io
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from app.core.config import settings
+
+LISTING_TTL = 5  # secondes entre deux relectures des dossiers de bundles
+
+def _season_key(saison: str) -> str:
+    return (saison or "").replace("/", "-")
+
+class SnapshotBundle:
+    """Bundle enregistré (immuable) d'une saison."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / "manifest.json", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest["version"]
+        self._venues = None
+
+    def csv_chunks(self, size: int = 64*1024):
+        """Export CSV brut par morceaux, lu via mmap (pages du fichier, sans lecture complète)."""
+        with open(self.path / "export.csv", "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, len(mm), size):
+                    yield mm[start:start + size]
+
+    def planning_html(self) -> bytes:
+        path = self.path / "planning.html"
+        return path.read_bytes() if path.exists() else b""
+
+    @property
+    def venues(self) -> dict:
+        if self._venues is None:
+            with open(self.path / "venues.json", encoding="utf-8") as f:
+                self._venues = json.load(f)
+        return self._venues
+
+class SnapshotSource:
+    """
+    Bundles disponibles sous `root`. `version` : "latest" (dernier bundle
+    enregistré de chaque saison, relu à chaque accès) ou une version fixe.
+    """
+    def __init__(self, root: Path, version: str = "latest"):
+        self.root = Path(root)
+        self.version = version
+        self._bundles = {}
+        self._venues = ((), {})    # (chemins des bundles servis, index fusionné)
+        self._listed_at = -LISTING_TTL
+        self._lock = threading.Lock()
+
+    def versions(self, saison: str) -> list:
+        base = self.root / _season_key(saison)
+        if not base.is_dir():
+            return []
+        # les dossiers ".<version>.*" sont des enregistrements en cours
+        return sorted(p.name for p in base.iterdir() if not p.name.startswith(".") and (p / "manifest.json").exists())
+
+    def seasons(self) -> list:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if self.versions(p.name))
+
+    def _served_version(self, saison: str):
+        """Version servie pour la saison, None si elle n'a pas la version demandée."""
+        versions = self.versions(saison)
+        if self.version == "latest":
+            return versions[-1] if versions else None
+        return self.version if self.version in versions else None
+
+    def bundle(self, saison: str) -> SnapshotBundle:
+        version = self._served_version(saison)
+        if version is None:
+            raise FileNotFoundError(f"Aucun snapshot {self.version} pour {_season_key(saison)} dans {self.root}")
+        path = self.root / _season_key(saison) / version
+        with self._lock:
+            bundle = self._bundles.get(path)
+            if bundle is None:
+                bundle = self._bundles[path] = SnapshotBundle(path)
+            return bundle
+
+    def venue_index(self) -> dict:
+        """
+        Adresses de tous les bundles servis ("<codmatch>_<codent>" -> adresse),
+        fusionnées une fois par ensemble de bundles ; les dossiers sont
+        relus au plus toutes les LISTING_TTL secondes.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._listed_at < LISTING_TTL:
+                return self._venues[1]
+        bundles = [self.bundle(saison) for saison in self.seasons() if self._served_version(saison)]
+        paths = tuple(bundle.path for bundle in bundles)
+        with self._lock:
+            if paths != self._venues[0]:
+                index = {}
+                for bundle in reversed(bundles):   # saison la plus ancienne prioritaire, comme avant
+                    index.update(bundle.venues)
+                self._venues = (paths, index)
+            self._listed_at = now
+            return self._venues[1]
+
+    def address(self, codmatch, codent):
+        """Adresse du gymnase dans les bundles servis (None si inconnue)."""
+        return self.venue_index().get(f"{codmatch}_{codent}")
+
+    def addresses(self, pairs) -> dict:
+        index = self.venue_index()
+        return {(codmatch, codent): index.get(f"{codmatch}_{codent}") for codmatch, codent in dict.fromkeys(pairs)}
+
+    # ---- Enregistrement ----
+
+    def record(self, saison: str, max_pdfs=None) -> SnapshotBundle:
+        """Télécharge CSV, page des poules et fiches match de la saison dans un nouveau bundle."""
+        from app.services.ffvb_client import ffvb_client
+        from app.services.data_provider import _csv_payload, parse_gymnase_pdf
+
+        saison = _season_key(saison)
+        version = time.strftime("%Y%m%d-%H%M%S")
+        target = self.root / saison / version
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Écriture dans un dossier temporaire puis renommage : un bundle
+        # visible est toujours complet
+        tmp = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{version}."))
+        try:
+            response = ffvb_client.request("csv", _csv_payload(saison))
+            response.raise_for_status()
+            csv_bytes = response.content
+            (tmp / "export.csv").write_bytes(csv_bytes)
+
+            response = ffvb_client.request("planning", {"cnclub": settings.club_id, "saison": saison.replace("-", "/")})
+            (tmp / "planning.html").write_bytes(response.content if response.status_code == 200 else b"")
+
+            rows = csv.reader(io.StringIO(csv_bytes.decode("latin1")), delimiter=";", quotechar='"')
+            pairs = list(dict.fromkeys((row[2], row[0]) for row in rows
+                                       if len(row) > 6 and row[3] != "Date" and row[6] != "xxxxx"))
+            pairs = pairs[:max_pdfs] if max_pdfs else pairs
+
+            def fetch(pair):
+                codmatch, codent = pair
+                return pair, ffvb_client.request("match_sheet", {"codmatch": codmatch, "codent": codent})
+
+            (tmp / "pdfs").mkdir()
+            venues = {}
+            with ThreadPoolExecutor(max_workers=settings.ffvb_address_concurrency) as executor:
+                for (codmatch, codent), response in executor.map(fetch, pairs):
+                    try:
+                        venues[f"{codmatch}_{codent}"] = parse_gymnase_pdf(response, codmatch, codent)
+                    except RuntimeError as e:
+                        # fiche indisponible : adresse inconnue du bundle
+                        print(e)
+                        continue
+                    (tmp / "pdfs" / f"{codmatch}_{codent}.pdf").write_bytes(response.content)
+
+            with open(tmp / "venues.json", "w", encoding="utf-8") as f:
+                json.dump(venues, f, ensure_ascii=False, indent=1, sort_keys=True)
+            with open(tmp / "manifest.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "saison": saison,
+                    "version": version,
+                    "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "club_id": settings.club_id,
+                    "csv_bytes": len(csv_bytes),
+                    "matches": len(pairs),
+                    "pdfs": len(list((tmp / "pdfs").glob("*.pdf"))),
+                    "venues": sum(1 for address in venues.values() if address),
+                }, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return self.bundle(saison) if self.version == "latest" else SnapshotBundle(target)
+
+# Instance par défaut
+snapshots = SnapshotSource(settings.snapshot_dir, settings.snapshot_version)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="enregistre une saison depuis le site FFVB")
+    rec.add_argument("--saison", action="append", required=True)
+    rec.add_argument("--pdfs", type=int, help="nombre maximum de fiches match (défaut : toutes)")
+    sub.add_parser("list", help="bundles disponibles")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from app.services.ffvb_client import ffvb_client, NoCache
+        ffvb_client.cache = NoCache()   # réponses fraîches, pas celles du cache HTTP
+        for saison in args.saison:
+            bundle = snapshots.record(saison, args.pdfs)
+            m = bundle.manifest
+            print(f"{m['saison']} {m['version']}: {m['matches']} matchs, {m['pdfs']} PDF, {m['venues']} adresses -> {bundle.path}")
+    else:
+        for saison in snapshots.seasons():
+            print(f"{saison}: {', '.join(snapshots.versions(saison))}")
+
+if __name__ == "__main__":
+    main()
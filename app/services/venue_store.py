@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from app.core.config import settings
+from app.services.metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venues (
+    codmatch    TEXT NOT NULL,
+    codent      TEXT NOT NULL,
+    found       INTEGER NOT NULL,
+    nom         TEXT,
+    rue         TEXT,
+    code_postal TEXT,
+    ville       TEXT,
+    fetched_at  REAL NOT NULL,
+    PRIMARY KEY (codmatch, codent)
+)
+"""
+
+class VenueStore:
+    """
+    Index persistant (sqlite) des adresses de gymnases par (codmatch, codent).
+
+    - found=1 : adresse structurée {nom, rue, code_postal, ville}, valable `ttl` secondes
+    - found=0 : résultat négatif (pas de PDF / salle illisible), valable `negative_ttl` secondes
+    Une entrée expirée reste lisible (stale) : elle sert de repli si le
+    rafraîchissement échoue.
+    """
+    def __init__(self, path: Path, ttl: int = 7*24*3600, negative_ttl: int = 3600):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Compteur d'échecs de résolution : entre dans la clé des rendus mis en
+        # cache, pour qu'un planning incomplet ne soit pas resservi.
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(SCHEMA)
+            self._conn.commit()
+
+    def _is_fresh(self, found, fetched_at, now):
+        return now - fetched_at < (self.ttl if found else self.negative_ttl)
+
+    def get_many(self, pairs):
+        """
+        Chargement groupé : une seule requête pour tout un planning.
+        Retourne {(codmatch, codent): (adresse ou None, fraîche?)} pour les paires connues.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            return {}
+        now = time.time()
+        results = {}
+        # Découpage pour rester sous la limite de variables sqlite
+        for i in range(0, len(pairs), 400):
+            chunk = pairs[i:i+400]
+            clause = " OR ".join(["(codmatch = ? AND codent = ?)"] * len(chunk))
+            params = [str(v) for pair in chunk for v in pair]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT codmatch, codent, found, nom, rue, code_postal, ville, fetched_at FROM venues WHERE {clause}",
+                    params,
+                ).fetchall()
+            for codmatch, codent, found, nom, rue, code_postal, ville, fetched_at in rows:
+                address = {'nom': nom, 'rue': rue, 'code_postal': code_postal, 'ville': ville} if found else None
+                results[(codmatch, codent)] = (address, self._is_fresh(found, fetched_at, now))
+        fresh = sum(1 for _, is_fresh in results.values() if is_fresh)
+        with self._lock:
+            self.hits += fresh
+            self.misses += len(pairs) - fresh
+        return results
+
+    def get(self, codmatch, codent):
+        return self.get_many([(codmatch, codent)]).get((str(codmatch), str(codent)))
+
+    def put_many(self, items):
+        """items: {(codmatch, codent): adresse ou None (résultat négatif)}"""
+        now = time.time()
+        rows = [
+            (str(codmatch), str(codent), 1 if address else 0,
+             (address or {}).get('nom'), (address or {}).get('rue'),
+             (address or {}).get('code_postal'), (address or {}).get('ville'), now)
+            for (codmatch, codent), address in items.items()
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO venues VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def put(self, codmatch, codent, address):
+        self.put_many({(codmatch, codent): address})
+
+    def purge(self, older_than: int):
+        """Supprime les entrées plus vieilles que `older_than` secondes."""
+        with self._lock:
+            self._conn.execute("DELETE FROM venues WHERE fetched_at < ?", (time.time() - older_than,))
+            self._conn.commit()
+
+# Instance par défaut
+venue_store = VenueStore(settings.venues_path, settings.venues_ttl, settings.venues_negative_ttl)
+metrics.register_cache("venues", lambda: (venue_store.hits, venue_store.misses))
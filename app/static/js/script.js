@@ -91,12 +91,10 @@ async function loadCategoriesForSeason() {
   }
 }
 
-// --- Soumission du formulaire ---
-async function submitForm(e) {
-  e.preventDefault();
-  document.getElementById("loading").style.display = "inline";
-  document.getElementById("resultImg").style.display = "none";
-
+// --- Génération de l'image ---
+// Aperçu basse résolution (preview=1, JPEG) pendant la saisie ;
+// la pleine qualité n'est rendue qu'au submit, au téléchargement et au partage.
+function buildImageUrl({ preview = false } = {}) {
   const saisonRaw = document.getElementById("saison").value;
   const saison = normalizeSeason(saisonRaw);
   const title = document.getElementById("title").value;
@@ -113,15 +111,61 @@ async function submitForm(e) {
   if (format) url += "&format=" + encodeURIComponent(format);
   if (date_start) url += "&date_start=" + encodeURIComponent(date_start);
   if (date_end) url += "&date_end=" + encodeURIComponent(date_end);
+  if (preview) url += "&preview=1&output=jpeg";
+  return url;
+}
+
+async function showImage(url, { preview = false, signal } = {}) {
+  const r = await fetch(url, { signal });
+  if (!r.ok) throw new Error("HTTP " + r.status);
+  const blob = await r.blob();
+  const img = document.getElementById("resultImg");
+  if (img.src) URL.revokeObjectURL(img.src);
+  img.src = URL.createObjectURL(blob);
+  img.dataset.preview = preview ? "1" : "";
+  img.style.display = "block";
+}
+
+let previewTimer = null;
+let previewController = null;
+
+function cancelPreview() {
+  clearTimeout(previewTimer);
+  if (previewController) previewController.abort();
+  previewController = null;
+}
+
+function schedulePreview() {
+  cancelPreview();
+  previewTimer = setTimeout(async () => {
+    previewController = new AbortController();
+    try {
+      await showImage(buildImageUrl({ preview: true }), { preview: true, signal: previewController.signal });
+    } catch (err) {
+      if (err.name !== "AbortError") console.warn("Aperçu indisponible:", err);
+    }
+  }, 300);
+}
+
+// Export : remplace l'aperçu par le rendu pleine qualité si besoin
+async function fullQualitySrc() {
+  const img = document.getElementById("resultImg");
+  if (img.dataset.preview === "1") {
+    cancelPreview();
+    await showImage(buildImageUrl());
+  }
+  return img.src;
+}
+
+// --- Soumission du formulaire ---
+async function submitForm(e) {
+  e.preventDefault();
+  cancelPreview();
+  document.getElementById("loading").style.display = "inline";
+  document.getElementById("resultImg").style.display = "none";
 
   try {
-    const r = await fetch(url);
-    if (!r.ok) throw new Error("HTTP " + r.status);
-    const blob = await r.blob();
-    const imgUrl = URL.createObjectURL(blob);
-    const img = document.getElementById("resultImg");
-    img.src = imgUrl;
-    img.style.display = "block";
+    await showImage(buildImageUrl());
   } catch (err) {
     console.error("Erreur génération image:", err);
     alert("Erreur lors de la génération de l'image.");
@@ -180,6 +224,11 @@ document.addEventListener("DOMContentLoaded", async function () {
   // Form submit
   document.getElementById("filterForm").addEventListener("submit", submitForm);
 
+  // Aperçu à chaque modification
+  document.getElementById("filterForm").addEventListener("input", schedulePreview);
+  document.getElementById("filterForm").addEventListener("change", schedulePreview);
+  schedulePreview();
+
   // Version dans le footer
   document.getElementById("versionInfo").textContent = "Version : " + APP_VERSION;
 
@@ -280,10 +329,10 @@ document.addEventListener("DOMContentLoaded", () => {
   });
 
   // Téléchargement direct
-  dlIcon.addEventListener("click", () => {
+  dlIcon.addEventListener("click", async () => {
     if (!resultImg.src) return;
     const a = document.createElement("a");
-    a.href = resultImg.src;
+    a.href = await fullQualitySrc();
     a.download = "image-veec.png";
     document.body.appendChild(a);
     a.click();
@@ -295,7 +344,7 @@ document.addEventListener("DOMContentLoaded", () => {
     if (!resultImg.src) return;
 
     try {
-      const resp = await fetch(resultImg.src, { cache: "no-store" });
+      const resp = await fetch(await fullQualitySrc(), { cache: "no-store" });
       const blob = await resp.blob();
       const file = new File([blob], "image-veec.png", { type: blob.type || "image/png" });
 
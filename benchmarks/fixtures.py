@@ -0,0 +1,149 @@
+"""
+Fixtures FFVB pour les benchmarks hors-ligne.
+
+    python -m benchmarks.fixtures record --saison 2025/2026 --pdfs 60
+    python -m benchmarks.fixtures synthetic
+
+Arborescence : benchmarks/fixtures/<saison>/{export.csv, planning.html, pdfs/<codmatch>_<codent>.pdf}
+Les fichiers sont enregistrés tels que renvoyés par la FFVB (latin-1, PDF bruts).
+"""
+import argparse
+import csv
+import io
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+def season_dir(saison: str) -> Path:
+    return FIXTURES_DIR / saison.replace("/", "-")
+
+def load_fixtures(saison: str) -> dict:
+    base = season_dir(saison)
+    pdfs = {}
+    for path in sorted((base / "pdfs").glob("*.pdf")):
+        codmatch, codent = path.stem.split("_", 1)
+        pdfs[(codmatch, codent)] = path.read_bytes()
+    return {
+        "csv": (base / "export.csv").read_bytes(),
+        "html": (base / "planning.html").read_bytes() if (base / "planning.html").exists() else b"",
+        "pdfs": pdfs,
+    }
+
+def available_seasons() -> list:
+    if not FIXTURES_DIR.exists():
+        return []
+    return sorted(p.name for p in FIXTURES_DIR.iterdir() if (p / "export.csv").exists())
+
+# ---- Enregistrement depuis le site FFVB ----
+
+def record(saison: str, max_pdfs: int):
+    from app.core.config import settings
+    from app.services.ffvb_client import ffvb_client, NoCache
+    from app.services.data_provider import _csv_payload
+
+    ffvb_client.cache = NoCache()
+    base = season_dir(saison)
+    (base / "pdfs").mkdir(parents=True, exist_ok=True)
+
+    csv_bytes = ffvb_client.request("csv", _csv_payload(saison)).content
+    (base / "export.csv").write_bytes(csv_bytes)
+
+    html = ffvb_client.request("planning", {"cnclub": settings.club_id, "saison": saison.replace("-", "/")}).content
+    (base / "planning.html").write_bytes(html)
+
+    rows = [r for r in csv.reader(io.StringIO(csv_bytes.decode("latin1")), delimiter=";", quotechar='"')
+            if len(r) > 6 and r[3] != "Date" and r[6] != "xxxxx"]
+    for row in rows[:max_pdfs]:
+        r = ffvb_client.request("match_sheet", {"codmatch": row[2], "codent": row[0]})
+        if r.status_code == 200:
+            (base / "pdfs" / f"{row[2]}_{row[0]}.pdf").write_bytes(r.content)
+    print(f"{saison}: {len(rows)} matchs, {len(list((base / 'pdfs').glob('*.pdf')))} PDF")
+
+# ---- Jeu synthétique déterministe (CI sans accès réseau) ----
+
+def _pdf(lines):
+    content = "BT /F1 10 Tf 50 800 Td 14 TL\n" + "".join(f"({l}) Tj T*\n" for l in lines) + "ET"
+    objs = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs)+1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+    out += f"trailer\n<< /Size {len(objs)+1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return out
+
+def synthetic(saison: str = "2025/2026", matches: int = 240, seed: int = 1):
+    from app.core.config import settings
+    from app.services.assets import logo_manifest
+
+    rnd = random.Random(seed)
+    cats = list(settings.saisons.get(saison.replace("/", "-"), {})) or ["DMA"]
+    clubs = sorted(code for code in logo_manifest() if code != "no_logo") + ["0000000"]
+    club = settings.club
+    base = season_dir(saison)
+    (base / "pdfs").mkdir(parents=True, exist_ok=True)
+
+    rows = [["Entite", "Jo", "Match", "Date", "Heure", "EQA_no", "EQA_nom", "EQB_no", "EQB_nom",
+             "Set", "Score", "Total", "Salle", "Arb1", "Arb2"]]
+    start = date(int(saison[:4]), 9, 27)
+    for i in range(matches):
+        day = start + timedelta(days=7 * (i // 12) + rnd.choice([0, 1]))
+        home = i % 2 == 0
+        opp_code = rnd.choice(clubs)
+        opp_name = f"CLUB ADVERSE {i} VOLLEY-BALL"
+        la, ta, lb, tb = (settings.club_id, f"{club} {1 + i % 2}", opp_code, opp_name) if home \
+            else (opp_code, opp_name, settings.club_id, club)
+        sets = score = ""
+        if i < matches // 2:
+            a = rnd.choice([3, 3, 2, 1, 0])
+            b = 3 if a < 3 else rnd.choice([0, 1, 2])
+            sets = f"{a}/{b}"
+            score = ",".join(f"{rnd.randint(15, 25)}-{rnd.randint(15, 25)}" for _ in range(a + b))
+        codmatch = f"{rnd.choice(cats)}{i:03d}"
+        place = rnd.choice(settings.club_gymnases + ["GYMNASE DE L'ADVERSAIRE"]) if home else "GYMNASE DE L'ADVERSAIRE"
+        rows.append(["ABCCS", f"J{1 + i // 12:02d}", codmatch, day.isoformat(), rnd.choice(["20:00", "15:30", "00:00"]),
+                     la, ta, lb, tb, sets, score, "", place, "", ""])
+        salle = place.replace("'", " ")
+        (base / "pdfs" / f"{codmatch}_ABCCS.pdf").write_bytes(_pdf([
+            "FICHE MATCH", "Salle", salle, f"{rnd.randint(1, 99)} avenue des Sports 77700 Chessy Tel: 0160000000",
+            "Sol : parquet", "Arbitre.s",
+        ]))
+
+    buf = io.StringIO()
+    csv.writer(buf, delimiter=";", quotechar='"', lineterminator="\n").writerows(rows)
+    (base / "export.csv").write_bytes(buf.getvalue().encode("latin1", errors="replace"))
+    (base / "planning.html").write_bytes(
+        b"<html><table>" + b"".join(f"<tr><td class='titrepoule'>{c} - CHAMPIONNAT DEPARTEMENTAL SENIOR MASCULIN</td></tr>".encode() for c in cats) + b"</table></html>"
+    )
+    print(f"{saison}: {matches} matchs synthétiques dans {base}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="enregistre les réponses FFVB")
+    rec.add_argument("--saison", action="append", required=True)
+    rec.add_argument("--pdfs", type=int, default=60)
+    syn = sub.add_parser("synthetic", help="génère un jeu déterministe sans réseau")
+    syn.add_argument("--saison", default="2025/2026")
+    syn.add_argument("--matches", type=int, default=240)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        for saison in args.saison:
+            record(saison, args.pdfs)
+    else:
+        synthetic(args.saison, args.matches)
+
+if __name__ == "__main__":
+    main()
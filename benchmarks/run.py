@@ -0,0 +1,245 @@
+"""
+Benchmarks hors-ligne du rendu /image (aucun accès réseau : les réponses
+FFVB sont servies depuis benchmarks/fixtures).
+
+    python -m benchmarks.run                         # toutes les saisons enregistrées
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 1.25
+
+Étapes mesurées séparément : csv (téléchargement simulé + parsing ;
+csv-filtered avec filtres date/catégorie appliqués pendant le parsing),
+address (extraction pdfplumber), layout (découpage de texte à froid),
+compose (dessin ; compose-cold sans les tuiles de lignes en cache) et
+encode (une mesure par sortie : PNG selon le niveau de compression, PNG
+palette, WebP, JPEG ; durée et octets), pour des plannings et résultats
+de 5, 15 et 40 lignes. Pour chaque étape : percentiles de latence et pic
+mémoire (allocations Python via tracemalloc, et croissance du RSS).
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from urllib.parse import parse_qs
+
+import httpx
+
+from benchmarks.fixtures import available_seasons, load_fixtures
+
+ROWS = (5, 15, 40)
+MODES = ("planning", "results")
+ENCODINGS = {
+    "png": dict(output="png"),
+    "png-fast": dict(output="png", level=1),
+    "png-max": dict(output="png", level=9),
+    "png8": dict(output="png8"),
+    "webp": dict(output="webp"),
+    "webp-lossless": dict(output="webp-lossless"),
+    "jpeg": dict(output="jpeg"),
+}
+
+def install_fixtures(fixtures_by_season: dict):
+    """Remplace le transport HTTP du client FFVB par les fixtures enregistrées."""
+    from app.services.ffvb_client import ffvb_client, NoCache
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params = {k: v[0] for k, v in parse_qs(request.content.decode()).items()} if request.content \
+            else dict(request.url.params)
+        url = str(request.url)
+        if "calendrier_export" in url:
+            fx = fixtures_by_season.get(params.get("cal_saison", "").replace("/", "-"))
+            return httpx.Response(200, headers={"Content-Type": "text/csv"}, content=fx["csv"]) if fx else httpx.Response(404)
+        if "planning_club" in url:
+            fx = fixtures_by_season.get(params.get("saison", "").replace("/", "-"))
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=fx["html"]) if fx else httpx.Response(404)
+        if "fiche_match" in url:
+            pair = (params.get("codmatch"), params.get("codent"))
+            for fx in fixtures_by_season.values():
+                if pair in fx["pdfs"]:
+                    return httpx.Response(200, headers={"Content-Type": "application/pdf"}, content=fx["pdfs"][pair])
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, content=b"")
+        return httpx.Response(404)
+
+    ffvb_client.transport = httpx.MockTransport(handler)
+    ffvb_client.cache = NoCache()
+
+def _rss_kb():
+    # ru_maxrss : Ko sous Linux, octets sous macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if platform.system() == "Darwin" else rss
+
+def measure(fn, repeat: int):
+    """Exécute fn `repeat` fois ; retourne latences (ms) et pics mémoire."""
+    timings = []
+    rss_before = _rss_kb()
+    tracemalloc.start()
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - t0) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak // 1024, max(0, _rss_kb() - rss_before)
+
+def percentiles(timings):
+    ordered = sorted(timings)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {"p50": pct(50), "p90": pct(90), "p99": pct(99), "mean": statistics.fmean(ordered)}
+
+def _sample(snapshot, mode: str, rows: int):
+    """`rows` matchs consécutifs (joués pour les résultats, sinon à venir)."""
+    played = [mt for mt in snapshot.matches if mt.score]
+    upcoming = [mt for mt in snapshot.matches if not mt.score]
+    pool = played if mode == "results" else upcoming
+    pool = pool if len(pool) >= rows else snapshot.matches
+    return pool[:rows]
+
+def run(seasons, repeat: int):
+    from app.services.data_provider import parse_gymnase_pdf
+    from app.services.ffvb_client import FFVBResponse
+    from app.services.image_gen import generate_filtered_image
+    from app.services.image_utils import layout_text
+    from app.services.match_store import SeasonMatches, load_season
+    from app.services.encoding import encode_image, encoding_options
+    from app.services.layer_cache import row_tiles
+    from app.services.assets import get_fonts, warm_assets
+    from app.core.config import settings
+
+    fixtures = {s: load_fixtures(s) for s in seasons}
+    install_fixtures(fixtures)
+    warm_assets(settings.assets_preload_formats, settings.assets_preload_multipliers)
+
+    results = {}
+
+    def record(name, timings, peak_kb, rss_kb, **extra):
+        results[name] = {**percentiles(timings), "peak_kb": peak_kb, "rss_growth_kb": rss_kb, "n": len(timings), **extra}
+
+    for saison in seasons:
+        fx = fixtures[saison]
+
+        # 1) CSV : décodage + parsing de l'export complet
+        holder = {}
+        def csv_stage():
+            holder["snapshot"] = load_season(saison)
+        record(f"{saison}/csv", *measure(csv_stage, repeat), rows=len(holder.get("snapshot").matches) if holder else 0)
+        snapshot = holder["snapshot"]
+
+        if snapshot.matches:
+            first = min(mt.date for mt in snapshot.matches)
+            window = dict(date_start=first, date_end=first + timedelta(days=7), categories=snapshot.categories[:3])
+            def csv_filtered_stage():
+                holder["filtered"] = load_season(saison, **window)
+            record(f"{saison}/csv-filtered", *measure(csv_filtered_stage, repeat), rows=len(holder["filtered"].matches))
+
+        # 2) Adresses : extraction pdfplumber sur le corpus de fiches match
+        pdfs = list(fx["pdfs"].items())
+        if pdfs:
+            def address_stage():
+                for (codmatch, codent), content in pdfs:
+                    parse_gymnase_pdf(FFVBResponse(200, "application/pdf", content), codmatch, codent)
+            record(f"{saison}/address", *measure(address_stage, repeat), pdfs=len(pdfs))
+
+        # 3) Mise en page du texte, à froid (cache vidé à chaque passe)
+        fonts = get_fonts(2)
+        texts = []
+        for mt in snapshot.matches[:40]:
+            cat = settings.get_season_config(saison, mt.cat_code)
+            texts += [(cat.get("niveau", ""), fonts["bold_15"], 230), (mt.team_a, fonts["bold_15"], 240),
+                      (mt.team_b, fonts["bold_15"], 240), (mt.place, fonts["bold_14"], 420)]
+        def layout_stage():
+            layout_text.cache_clear()
+            for text, fnt, width in texts:
+                layout_text(text, fnt, width)
+        record(f"{saison}/layout", *measure(layout_stage, repeat), texts=len(texts))
+
+        # 4) et 5) Composition et encodage par mode et nombre de lignes
+        for mode in MODES:
+            for rows in ROWS:
+                matches = _sample(snapshot, mode, rows)
+                sample = SeasonMatches(saison, matches, version="bench")
+                date_start = min(mt.date for mt in matches)
+                date_end = max(mt.date for mt in matches)
+                addresses = {}
+                if mode == "planning":
+                    for mt in matches:
+                        content = fx["pdfs"].get((mt.codmatch, mt.entity))
+                        addresses[(mt.codmatch, mt.entity)] = parse_gymnase_pdf(
+                            FFVBResponse(200, "application/pdf", content), mt.codmatch, mt.entity) if content else None
+                params = dict(date_start=date_start.strftime("%Y-%m-%d"), date_end=date_end.strftime("%Y-%m-%d"),
+                              title="Benchmark", format="pub", mode=mode, saison=saison)
+
+                images = {}
+                def compose_stage():
+                    images["img"] = generate_filtered_image(**params, snapshot=sample, addresses=addresses)
+                record(f"{saison}/compose/{mode}/{rows}", *measure(compose_stage, repeat), rows=len(matches))
+
+                def compose_cold_stage():
+                    row_tiles.clear()
+                    compose_stage()
+                record(f"{saison}/compose-cold/{mode}/{rows}", *measure(compose_cold_stage, repeat), rows=len(matches))
+
+                img = images["img"]
+                sizes = {}
+                for name, encoding in ENCODINGS.items():
+                    opts = encoding_options(**encoding)
+                    def encode_stage():
+                        sizes["bytes"] = len(encode_image(img, opts))
+                    record(f"{saison}/encode/{name}/{mode}/{rows}", *measure(encode_stage, repeat), bytes=sizes["bytes"])
+
+    return results
+
+def print_report(results, baseline=None):
+    print(f"{'étape':<48} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'pic Ko':>9} {'RSS+ Ko':>9} {'octets':>10}" + ("  vs base" if baseline else ""))
+    for name, r in results.items():
+        line = f"{name:<48} {r['p50']:>9.1f} {r['p90']:>9.1f} {r['p99']:>9.1f} {r['peak_kb']:>9} {r['rss_growth_kb']:>9} {r.get('bytes', ''):>10}"
+        if baseline and name in baseline:
+            line += f"  x{r['p50'] / baseline[name]['p50']:.2f}" if baseline[name]["p50"] else ""
+        print(line)
+
+def compare(results, baseline, tolerance: float):
+    """Étapes dont le p50 dépasse `tolerance` x la référence."""
+    return [
+        name for name, r in results.items()
+        if name in baseline and baseline[name]["p50"] and r["p50"] > baseline[name]["p50"] * tolerance
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--saison", action="append", help="saison(s) à mesurer (défaut : toutes les fixtures)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save", help="enregistre les résultats comme référence (JSON)")
+    parser.add_argument("--compare", help="compare à une référence ; code retour 1 en cas de régression")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    seasons = [s.replace("/", "-") for s in args.saison] if args.saison else available_seasons()
+    if not seasons:
+        sys.exit("Aucune fixture : python -m benchmarks.fixtures record|synthetic")
+
+    results = run(seasons, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "repeat": args.repeat, "results": results}, f, indent=2, ensure_ascii=False)
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Régressions : " + ", ".join(regressions))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
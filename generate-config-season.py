@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+# Script autonome, hors application (qui passe par httpx) :
+#   pip install requests bs4
 
 import sys
 import html
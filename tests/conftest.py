@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Les tests importent le paquet `app` depuis la racine du dépôt
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,52 @@
+import pytest
+from app.services import data_provider
+from app.services.ffvb_client import FFVBResponse
+from app.services.venue_store import VenueStore
+
+ADDRESS = {"nom": "GYMNASE", "rue": "1 rue des sports", "code_postal": "77700", "ville": "Chessy"}
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = VenueStore(tmp_path / "venues.sqlite")
+    monkeypatch.setattr(data_provider, "venue_store", store)
+    return store
+
+def _serve(monkeypatch, response):
+    monkeypatch.setattr(data_provider.ffvb_client, "request", lambda endpoint, params, timeout=None: response)
+
+@pytest.mark.parametrize("response", [
+    FFVBResponse(503, "text/html", b"Service Unavailable"),
+    FFVBResponse(200, "text/html", b"<html>erreur</html>"),
+])
+def test_upstream_error_is_a_failure_not_a_negative_entry(store, monkeypatch, response):
+    store.put_many({("DMA001", "ABC"): ADDRESS})
+    store.ttl = 0   # entrée périmée : à rafraîchir
+    _serve(monkeypatch, response)
+
+    result = data_provider.get_gymnase_addresses([("DMA001", "ABC"), ("DMA002", "ABC")])
+
+    # repli sur l'adresse périmée, rien d'enregistré pour l'inconnue
+    assert result == {("DMA001", "ABC"): ADDRESS, ("DMA002", "ABC"): None}
+    assert store.failures == 1
+    assert store.get_many([("DMA002", "ABC")]) == {}
+    assert store.get_many([("DMA001", "ABC")])[("DMA001", "ABC")][0] == ADDRESS
+
+def test_pdf_without_venue_is_stored_as_negative(store, monkeypatch):
+    _serve(monkeypatch, FFVBResponse(200, "application/pdf", b"%PDF"))
+    monkeypatch.setattr(data_provider.pdfplumber, "open", _EmptyPdf)
+
+    assert data_provider.get_gymnase_addresses([("DMA003", "ABC")]) == {("DMA003", "ABC"): None}
+    assert store.failures == 0
+    assert store.get_many([("DMA003", "ABC")]) == {("DMA003", "ABC"): (None, True)}
+
+class _EmptyPdf:
+    pages = []
+
+    def __init__(self, stream):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,53 @@
+import os
+import pytest
+from app.core.config import SeasonConfigStore
+
+V1 = "saisons:\n  2025-2026:\n    DMA: {titre: Départementale}\n"
+V2 = "saisons:\n  2025-2026:\n    DMA: {titre: Départementale}\n    M6F: {titre: Coupe M15}\n"
+
+@pytest.fixture
+def saisons(tmp_path):
+    path = tmp_path / "saisons.yaml"
+    path.write_text(V1, encoding="utf-8")
+    return path
+
+def _touch(path, content, ns):
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(ns, ns))
+
+def test_reload_publishes_new_content_as_new_version(saisons):
+    store = SeasonConfigStore(saisons, check_interval=0)
+    first = store.current()
+    assert list(first.saisons["2025-2026"]) == ["DMA"]
+
+    _touch(saisons, V2, first.stamp[0] + 10**9)
+    second = store.current()
+    assert second.version != first.version
+    assert list(second.saisons["2025-2026"]) == ["DMA", "M6F"]
+    assert list(first.saisons["2025-2026"]) == ["DMA"]   # l'ancien instantané reste intact
+
+def test_same_content_keeps_version(saisons):
+    store = SeasonConfigStore(saisons, check_interval=0)
+    first = store.current()
+    _touch(saisons, V1, first.stamp[0] + 10**9)
+    again = store.current()
+    assert again.version == first.version
+    assert again.saisons is first.saisons
+    assert again.stamp != first.stamp
+
+def test_checks_file_at_most_every_interval(saisons):
+    store = SeasonConfigStore(saisons, check_interval=3600)
+    first = store.current()
+    _touch(saisons, V2, first.stamp[0] + 10**9)
+    assert store.current() is first
+    assert list(store.reload().saisons["2025-2026"]) == ["DMA", "M6F"]
+
+def test_invalid_file_keeps_known_version(saisons):
+    store = SeasonConfigStore(saisons, check_interval=0)
+    first = store.current()
+    _touch(saisons, "saisons: [non ferm", first.stamp[0] + 10**9)
+    assert store.current().version == first.version
+
+def test_missing_file_is_empty(tmp_path):
+    store = SeasonConfigStore(tmp_path / "absent.yaml")
+    assert store.current().saisons == {}
@@ -0,0 +1,25 @@
+import pytest
+from app.services.encoding import encoding_options, negotiate
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("", None),
+    ("*/*", None),
+    ("image/*", None),
+    ("image/webp", "webp"),
+    ("image/avif,image/webp,image/apng,*/*;q=0.8", "webp"),        # Chrome : avif inconnu
+    ("image/png;q=0.5, image/jpeg", "jpeg"),                        # q décroissants
+    ("image/webp;q=0.9, image/png;q=0.9", "webp"),                  # ex aequo : ordre de l'en-tête
+    ("*/*, image/webp;q=0.5", None),                                # tout accepté d'abord
+    ("image/webp;q=0, image/png", "png"),                           # q=0 : refusé
+    ("image/webp;q=abc, image/jpeg;q=0.1", "jpeg"),                 # q invalide : refusé
+    ("text/html, application/json", None),
+    ("IMAGE/PNG", "png"),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+def test_negotiated_output_is_a_known_encoding():
+    assert encoding_options(negotiate("image/webp"))["output"] == "webp"
+    with pytest.raises(ValueError):
+        encoding_options("gif")
@@ -0,0 +1,49 @@
+import pytest
+from app.services import data_provider
+from app.services.data_provider import PENDING_ADDRESS
+from app.services.ffvb_client import FFVBResponse
+from app.services.image_gen import drawn_addresses, image_cache_key, select_matches
+from app.services.match_store import load_season
+from app.services.venue_store import VenueStore
+
+PAIR = ("DMA001", "ABCCS")
+ROWS = [["ABCCS", "1", "DMA001", "2025-11-22", "20:00", "001", "CLUB A", "002", "CLUB B", "", "", "", "GYMNASE"]]
+PARAMS = (None, "2025-11-22", "2025-11-23", "Matchs", "pub", "planning", "2025-2026")
+
+@pytest.fixture
+def venues(tmp_path, monkeypatch):
+    store = VenueStore(tmp_path / "venues.sqlite")
+    monkeypatch.setattr(data_provider, "venue_store", store)
+    # fiches match indisponibles (préchargement de l'aperçu compris)
+    monkeypatch.setattr(data_provider.ffvb_client, "request", lambda *args, **kwargs: FFVBResponse(503, "text/plain", b""))
+    return store
+
+def _key(snapshot, preview):
+    addresses = drawn_addresses(select_matches(snapshot, *PARAMS[:3]), preview)
+    return addresses, image_cache_key(*PARAMS, snapshot=snapshot, preview=preview, addresses=addresses)
+
+def test_preview_key_tells_pending_from_not_found(venues):
+    snapshot = load_season("2025-2026", rows=ROWS)
+    pending, pending_key = _key(snapshot, preview=True)
+    assert pending[PAIR] is PENDING_ADDRESS
+
+    venues.put_many({PAIR: None})   # fiche lue, sans adresse
+    missing, missing_key = _key(snapshot, preview=True)
+    assert missing[PAIR] is None
+    assert missing_key != pending_key
+
+def test_key_depends_only_on_the_pairs_drawn(venues):
+    snapshot = load_season("2025-2026", rows=ROWS)
+    failed, key = _key(snapshot, preview=False)
+    assert failed[PAIR] is None and venues.failures == 1
+
+    # échec sur un autre gymnase : compteur du processus, pas cette image
+    data_provider.get_gymnase_addresses([("M6F002", "ABCCS")])
+    assert venues.failures == 2
+    assert _key(snapshot, preview=False)[1] == key
+
+    # la fiche est retentée à la requête suivante ; trouvée, elle change la clé
+    address = {"nom": "GYMNASE", "rue": "1 rue des Sports", "code_postal": "77700", "ville": "Chessy"}
+    venues.put_many({PAIR: address})
+    found, found_key = _key(snapshot, preview=False)
+    assert found[PAIR] == address and found_key != key
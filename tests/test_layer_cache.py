@@ -0,0 +1,42 @@
+from PIL import Image
+from app.services.layer_cache import ImageCache, image_bytes
+
+def _img(width, height=10, mode="RGBA"):
+    return Image.new(mode, (width, height))
+
+def test_image_bytes_counts_pixels_and_bands():
+    assert image_bytes(_img(10)) == 400
+    assert image_bytes(_img(10, mode="L")) == 100
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ImageCache(max_bytes=1000)   # 2 images de 400 octets tiennent, pas 3
+    cache.put("a", _img(10))
+    cache.put("b", _img(10))
+    assert cache.get("a") is not None    # "a" redevient la plus récente
+    cache.put("c", _img(10))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache._size == 800
+
+def test_replacing_a_key_releases_its_bytes():
+    cache = ImageCache(max_bytes=1000)
+    cache.put("a", _img(20))             # 800
+    cache.put("a", _img(5))              # 200
+    cache.put("b", _img(20))             # 800 : tient avec la nouvelle "a"
+    assert cache.get("a") is not None and cache.get("b") is not None
+    assert cache._size == 1000
+
+def test_oversized_entry_is_not_cached():
+    cache = ImageCache(max_bytes=1000)
+    cache.put("a", _img(10))
+    cache.put("big", _img(30))           # 1200 > max_bytes
+    assert cache.get("big") is None
+    assert cache.get("a") is not None
+
+def test_custom_sizeof_and_stats():
+    cache = ImageCache(max_bytes=10, sizeof=len)
+    cache.put("a", "x" * 6)
+    cache.put("b", "x" * 6)
+    assert cache.get("a") is None
+    assert cache.get("b") == "x" * 6
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,50 @@
+from datetime import datetime
+import pytest
+from PIL import ImageChops
+from app.services.image_gen import header_layer, row_values
+from app.services.layout import get_plan
+from app.services.match_store import Match
+from app.services.score_utils import parse_score
+
+SAISON = "2025-2026"
+CLUB = "FS VAL D'EUROPE ESBLY COUPVRAY VB"
+ADDRESS = {"nom": "GYMNASE DAVID DOUILLET", "rue": "12 rue des Sports", "code_postal": "77700", "ville": "Chessy"}
+
+def _matches():
+    rows = [
+        ("1MB", "0775819", CLUB, "0916131", "AS ADVERSAIRE", "3/1", "25-20,23-25,25-18,25-22", "GYMNASE DAVID DOUILLET"),
+        ("PVA", "0916131", "AS ADVERSAIRE AVEC UN TRES LONG NOM DE CLUB", "0775819", CLUB + " 2", "3/0", "25-10,25-12,25-14", "SALLE AILLEURS"),
+        ("1MB", "0788607", "CLUB ADVERSE", "0775819", CLUB, "", "", "PARC DES SPORTS"),
+    ]
+    return [
+        Match(index=i, entity="ABCCS", codmatch=f"{cat}{i:03d}", date=datetime(2025, 11, 22 + i % 2), hour="20:00",
+              cat_code=cat, logo_a=logo_a, team_a=team_a, logo_b=logo_b, team_b=team_b,
+              sets=sets, score=score, place=place)
+        for i, (cat, logo_a, team_a, logo_b, team_b, sets, score, place) in enumerate(rows)
+    ]
+
+# "pub" seul : le dépôt ne fournit pas de fond pour "story"
+@pytest.mark.parametrize("format", ["pub"])
+@pytest.mark.parametrize("mode", ["planning", "results"])
+def test_tile_matches_direct_drawing(mode, format):
+    # Tuile collée sur l'entête vs ligne dessinée directement : l'arrondi de
+    # `content + fond * keep / 255` diffère d'au plus 1 sur les pixels antialiasés
+    m = 1
+    plan = get_plan(format, mode, m)
+    background = header_layer(format, "Matchs", "Samedi 22 novembre", m)
+    direct, tiled = background.copy(), background.copy()
+    for mt, top in zip(_matches(), plan.row_tops(3)):
+        addresses = {(mt.codmatch, mt.entity): ADDRESS} if mt.index else {}
+        values = row_values(mt, mode, format, SAISON, addresses, m)
+        if mt.score:
+            assert len(parse_score(mt.score)) == mt.score.count(",") + 1   # grille des sets dessinée
+        direct = plan.draw_row(direct, values, top)
+        tiled = plan.paste_tile(tiled, plan.draw_tile(values, tiled.width), top)
+
+    bands = ImageChops.difference(direct.convert("RGBA"), tiled.convert("RGBA")).split()
+    assert max(band.getextrema()[1] for band in bands) <= 1
+    diff = bands[0]
+    for band in bands[1:]:
+        diff = ImageChops.lighter(diff, band)
+    unchanged = diff.histogram()[0]
+    assert direct.width * direct.height - unchanged < 0.01 * direct.width * direct.height
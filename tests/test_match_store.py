@@ -0,0 +1,62 @@
+from datetime import datetime
+import pytest
+from app.core.config import settings
+from app.services import match_store as store_module
+from app.services.match_store import MatchStore, load_season, scan_matches
+
+HEADER = ["Entité", "Jo", "Match", "Date", "Heure", "EQA_no", "EQA_nom", "EQB_no", "EQB_nom", "Set", "Score", "Total", "Salle"]
+
+def _row(codmatch, day, team_a="CLUB A", team_b="CLUB B"):
+    return ["ABCCS", "1", codmatch, f"2025-11-{day:02d}", "20:00", "001", team_a, "002", team_b, "", "", "", "GYMNASE"]
+
+ROWS = [
+    HEADER,
+    _row("DMA001", 22),
+    _row("M6F002", 22),
+    _row("DMA003", 23),
+    _row("DMA004", 29),
+    _row("DMA005", 30, team_a="xxxxx"),   # exempt
+    ["ABCCS", "1", "DMA006"],              # ligne tronquée
+    _row("L41007", 23),
+]
+
+def _codes(matches):
+    return [mt.codmatch for mt in matches]
+
+@pytest.mark.parametrize("kwargs, expected", [
+    ({}, ["DMA001", "M6F002", "DMA003", "DMA004", "L41007"]),
+    ({"date_start": datetime(2025, 11, 23)}, ["DMA003", "DMA004", "L41007"]),
+    ({"date_end": datetime(2025, 11, 22)}, ["DMA001", "M6F002"]),
+    ({"date_start": datetime(2025, 11, 22), "date_end": datetime(2025, 11, 23), "categories": ["DMA", "L41"]},
+     ["DMA001", "DMA003", "L41007"]),
+])
+def test_scan_matches_filters(kwargs, expected):
+    matches = list(scan_matches(ROWS, **kwargs))
+    assert _codes(matches) == expected
+    # position dans l'export conservée malgré le filtrage
+    assert [mt.index for mt in matches] == [int(code[3:]) for code in expected]
+
+def test_filtered_load_is_versioned_apart():
+    full = load_season("2025-2026", rows=ROWS)
+    partial = load_season("2025-2026", rows=ROWS, categories=["M6F"])
+    assert _codes(partial.query()) == ["M6F002"]
+    assert partial.version.startswith(full.version) and partial.version != full.version
+
+def test_for_query_loads_only_the_window_outside_tracked_seasons(monkeypatch):
+    monkeypatch.setitem(settings.config["club"], "saisons", ["2025/2026"])
+    loads = []
+
+    def loader(saison, rows=None, **filters):
+        loads.append((saison, filters))
+        return load_season(saison, rows=ROWS, **filters)
+
+    monkeypatch.setattr(store_module, "load_season", loader)
+    store = MatchStore(loader=loader)
+
+    archive = store.for_query("2019/2020", "2025-11-22", "2025-11-22", ["DMA"])
+    assert _codes(archive.query()) == ["DMA001"]
+    assert loads[-1] == ("2019-2020", {"date_start": datetime(2025, 11, 22), "date_end": datetime(2025, 11, 22), "categories": ["DMA"]})
+
+    tracked = store.for_query("2025/2026", "2025-11-22", "2025-11-22", ["DMA"])
+    assert tracked is store.get("2025-2026")
+    assert len(tracked.matches) == 5
@@ -0,0 +1,20 @@
+from app.services.metrics import Metrics
+
+def test_render_mixed_label_types():
+    # statut HTTP (int) et exception de transport (str) sur le même label
+    m = Metrics()
+    m.inc("ffvb_upstream_errors_total", endpoint="csv", reason=503)
+    m.inc("ffvb_upstream_errors_total", endpoint="csv", reason="ConnectError")
+    m.observe("ffvb_request_seconds", 0.1, route="/image", status=200)
+    m.observe("ffvb_request_seconds", 0.2, route="/image", status="304")
+
+    text = m.render()
+    assert 'ffvb_upstream_errors_total{endpoint="csv",reason="503"} 1' in text
+    assert 'ffvb_upstream_errors_total{endpoint="csv",reason="ConnectError"} 1' in text
+    assert 'ffvb_request_seconds_count{route="/image",status="200"} 1' in text
+
+def test_same_label_value_as_int_or_str_is_one_series():
+    m = Metrics()
+    m.inc("hits", code=404)
+    m.inc("hits", code="404")
+    assert 'hits{code="404"} 2' in m.render()
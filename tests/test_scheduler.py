@@ -0,0 +1,61 @@
+from datetime import date
+import pytest
+from app.core.config import settings
+from app.services import data_provider, scheduler
+from app.services.encoding import encoding_options
+from app.services.ffvb_client import FFVBResponse
+from app.services.image_gen import drawn_addresses, image_cache_key, select_matches
+from app.services.match_store import MatchStore, load_season
+from app.services.render_cache import render_cache
+from app.services.venue_store import VenueStore
+
+ADDRESS = {"nom": "GYMNASE DAVID DOUILLET", "rue": "12 rue des Sports", "code_postal": "77700", "ville": "Chessy"}
+
+def _row(codmatch, day, sets="", score=""):
+    return ["ABCCS", "1", codmatch, f"2025-11-{day:02d}", "20:00", "0775819", settings.club,
+            "0916131", "AS ADVERSAIRE", sets, score, "", "GYMNASE DAVID DOUILLET"]
+
+ROWS = [
+    _row("DMA001", 22, "3/1", "25-20,23-25,25-18,25-22"),
+    _row("M6F002", 23),
+    _row("L41003", 29),
+]
+
+@pytest.mark.parametrize("period, expected", [
+    ("next_weekend", ("2025-11-22", "2025-11-23")),
+    ("last_weekend", ("2025-11-15", "2025-11-16")),
+])
+def test_weekend_dates_on_a_monday(period, expected):
+    assert scheduler.weekend_dates(date(2025, 11, 17), period) == expected
+
+def test_last_weekend_is_the_current_one_on_sunday():
+    assert scheduler.weekend_dates(date(2025, 11, 23), "last_weekend") == ("2025-11-22", "2025-11-23")
+
+@pytest.fixture
+def season(tmp_path, monkeypatch):
+    store = MatchStore(loader=lambda saison: load_season(saison, rows=ROWS))
+    monkeypatch.setattr(scheduler, "match_store", store)
+    monkeypatch.setattr(scheduler, "weekend_dates", lambda today, period: ("2025-11-22", "2025-11-23"))
+    venues = VenueStore(tmp_path / "venues.sqlite")
+    venues.put_many({(row[2], row[0]): ADDRESS for row in ROWS})
+    monkeypatch.setattr(data_provider, "venue_store", venues)
+    # aucune fiche match à télécharger : toutes les adresses sont connues
+    monkeypatch.setattr(data_provider.ffvb_client, "request", lambda *args, **kwargs: FFVBResponse(503, "text/plain", b""))
+    render_cache.clear()
+    return store
+
+@pytest.mark.parametrize("mode", ["planning", "results"])
+def test_prerender_fills_the_cache_for_the_ui_defaults(season, mode):
+    # job sans saison : club.saisons[-1], au format "2025/2026"
+    scheduler.prerender({"mode": mode})
+
+    # requêtes de l'interface sans saisie (titre vide, toutes les catégories),
+    # clés calculées comme dans /image
+    snapshot = season.get("2025-2026")
+    params = (list(settings.saisons["2025-2026"]), "2025-11-22", "2025-11-23", "Matchs", "pub", mode, "2025-2026")
+    for preview, output in ((True, "jpeg"), (False, None)):
+        matches = select_matches(snapshot, *params[:3])
+        addresses = drawn_addresses(matches, preview) if mode == "planning" else None
+        key = image_cache_key(*params, snapshot=snapshot, encoding=encoding_options(output),
+                              preview=preview, addresses=addresses)
+        assert render_cache.get(key) is not None
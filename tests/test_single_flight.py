@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import pytest
+from app.services import seasons
+from app.services.ffvb_client import FFVBResponse
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+def _concurrent(flight, fn, n=5):
+    """Lance `n` appels de même clé pendant que le premier est bloqué dans `fn`."""
+    started, release = threading.Event(), threading.Event()
+    outcomes = [None] * n
+
+    def leader_fn():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    def call(i):
+        try:
+            outcomes[i] = ("ok", flight.do("key", leader_fn))
+        except Exception as e:
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(0,))]
+    threads[0].start()
+    assert started.wait(5)
+    threads += [threading.Thread(target=call, args=(i,)) for i in range(1, n)]
+    for t in threads[1:]:
+        t.start()
+    # les suivants sont en attente sur l'appel en cours avant qu'il ne se termine
+    while flight.shared < n - 1:
+        threading.Event().wait(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+    return outcomes
+
+def test_concurrent_callers_share_one_result():
+    flight = SingleFlight("test")
+    calls = []
+    outcomes = _concurrent(flight, lambda: calls.append(1) or "data")
+    assert calls == [1]
+    assert outcomes == [("ok", "data")] * 5
+    assert (flight.calls, flight.shared) == (1, 4)
+
+def test_concurrent_callers_share_the_error():
+    flight = SingleFlight("test")
+    error = RuntimeError("FFVB indisponible")
+
+    def fail():
+        raise error
+
+    outcomes = _concurrent(flight, fail)
+    assert [kind for kind, _ in outcomes] == ["error"] * 5
+    assert all(e is error for _, e in outcomes)
+    assert flight.calls == 1
+
+def test_nothing_is_kept_after_the_call():
+    flight = SingleFlight("test")
+    with pytest.raises(ValueError):
+        flight.do("key", int, "pas un nombre")
+    # échec non mémorisé : l'appel suivant réexécute la fonction
+    assert flight.do("key", int, "42") == 42
+    assert flight.calls == 2
+
+def test_async_callers_share_one_task_and_its_error():
+    async def main():
+        flight = AsyncSingleFlight("test")
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch(fail):
+            calls.append(1)
+            await release.wait()
+            if fail:
+                raise RuntimeError("FFVB indisponible")
+            return "lignes"
+
+        waiters = [asyncio.ensure_future(flight.do("key", fetch, False)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == ["lignes"] * 3
+        assert (len(calls), flight.shared) == (1, 2)
+
+        release.clear()
+        waiters = [asyncio.ensure_future(flight.do("key", fetch, True)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        errors = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(e, RuntimeError) for e in errors) and errors[0] is errors[2]
+        assert len(calls) == 2 and not flight._tasks
+
+    asyncio.run(main())
+
+def test_concurrent_planning_fetches_send_one_request(monkeypatch):
+    requests = []
+
+    async def arequest(endpoint, params, timeout=None):
+        requests.append(params)
+        await asyncio.sleep(0.01)
+        return FFVBResponse(200, "text/html", b"<td class='titrepoule'>DMA - DEPARTEMENTAL</td>")
+
+    monkeypatch.setattr(seasons.ffvb_client, "arequest", arequest)
+
+    async def main():
+        return await asyncio.gather(*(seasons.afetch_lines("0775819", "2025/2026") for _ in range(3)),
+                                    seasons.afetch_lines("0775819", "2024/2025"))
+
+    results = asyncio.run(main())
+    assert results == [["DMA - DEPARTEMENTAL"]] * 4
+    assert len(requests) == 2
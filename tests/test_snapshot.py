@@ -0,0 +1,45 @@
+import json
+import pytest
+from app.services.snapshot import SnapshotSource
+
+def _bundle(root, saison, version, venues, csv=b"Entite;Jo;Match;Date\n"):
+    path = root / saison / version
+    path.mkdir(parents=True)
+    (path / "manifest.json").write_text(json.dumps({"saison": saison, "version": version}))
+    (path / "venues.json").write_text(json.dumps(venues))
+    (path / "export.csv").write_bytes(csv)
+    return path
+
+ADDRESS_OLD = {"nom": "GYMNASE A", "rue": "1 rue", "code_postal": "77700", "ville": "Chessy"}
+ADDRESS_NEW = {"nom": "GYMNASE B", "rue": "2 rue", "code_postal": "77700", "ville": "Chessy"}
+
+@pytest.fixture
+def root(tmp_path):
+    _bundle(tmp_path, "2024-2025", "20250101-000000", {"DMA001_ABC": ADDRESS_OLD})
+    _bundle(tmp_path, "2025-2026", "20251101-000000", {"DMA101_ABC": ADDRESS_OLD})
+    _bundle(tmp_path, "2025-2026", "20251201-000000", {"DMA101_ABC": ADDRESS_NEW, "DMA102_ABC": None})
+    # enregistrement en cours : ignoré
+    (tmp_path / "2025-2026" / ".20251215-000000.tmp").mkdir()
+    return tmp_path
+
+def test_latest_serves_newest_version_of_each_season(root):
+    source = SnapshotSource(root)
+    assert source.bundle("2025/2026").version == "20251201-000000"
+    assert source.addresses([("DMA101", "ABC"), ("DMA001", "ABC"), ("XXX", "ABC")]) == {
+        ("DMA101", "ABC"): ADDRESS_NEW,
+        ("DMA001", "ABC"): ADDRESS_OLD,
+        ("XXX", "ABC"): None,
+    }
+
+def test_pinned_version_skips_seasons_without_it(root):
+    source = SnapshotSource(root, version="20251101-000000")
+    assert source.address("DMA101", "ABC") == ADDRESS_OLD
+    assert source.address("DMA001", "ABC") is None
+    with pytest.raises(FileNotFoundError):
+        source.bundle("2024-2025")
+
+def test_csv_chunks_cover_the_file(root):
+    csv = b"x;y\n" * 50000
+    _bundle(root, "2023-2024", "20240101-000000", {}, csv=csv)
+    bundle = SnapshotSource(root).bundle("2023-2024")
+    assert b"".join(bundle.csv_chunks(size=4096)) == csv